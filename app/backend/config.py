@@ -7,4 +7,99 @@ class Config:
     # Fetch Supabase credentials from environment variables
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
-    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "")
\ No newline at end of file
+    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "")
+    # Bearer tokens are verified locally on every request. AUTH_REQUIRED also rejects requests
+    # without a valid token; while it is off, missing, invalid or expired tokens are anonymous
+    AUTH_REQUIRED: bool = os.getenv("AUTH_REQUIRED", "false").lower() == "true"
+    # Per-worker cache of Users and Patients rows behind identity lookups
+    IDENTITY_CACHE_TTL_SECONDS: int = int(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "300"))
+    IDENTITY_CACHE_MAX_ENTRIES: int = int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", "5000"))
+
+    # YOLO detectors, loaded once per worker by services/model_registry.py
+    ANOMALIES_MODEL_PATH: str = os.getenv("ANOMALIES_MODEL_PATH", "models/anomalies.pt")
+    TEETH_MODEL_PATH: str = os.getenv("TEETH_MODEL_PATH", "models/teeth.pt")
+    WARMUP_MODELS: bool = os.getenv("WARMUP_MODELS", "true").lower() == "true"
+    # Exported models (scripts/export_models.py) skip PyTorch: runtime for .onnx files
+    # ("onnxruntime" or "openvino") and their thread count (0 = runtime default)
+    MODEL_RUNTIME: str = os.getenv("MODEL_RUNTIME", "onnxruntime")
+    MODEL_THREADS: int = int(os.getenv("MODEL_THREADS", "0"))
+
+    # Micro-batching of concurrent /upload requests (services/inference_engine.py), and how
+    # long a request waits for its result before failing
+    INFERENCE_BATCH_WINDOW_MS: int = int(os.getenv("INFERENCE_BATCH_WINDOW_MS", "20"))
+    INFERENCE_MAX_BATCH: int = int(os.getenv("INFERENCE_MAX_BATCH", "4"))
+    INFERENCE_TIMEOUT_SECONDS: float = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "120"))
+
+    # Detector input size (0 = the models' default) and tiled inference for large radiographs:
+    # detectors in INFERENCE_TILED_MODELS see overlapping tiles when INFERENCE_TILE_SIZE > 0
+    INFERENCE_IMGSZ: int = int(os.getenv("INFERENCE_IMGSZ", "0"))
+    INFERENCE_TILE_SIZE: int = int(os.getenv("INFERENCE_TILE_SIZE", "0"))
+    INFERENCE_TILE_OVERLAP: int = int(os.getenv("INFERENCE_TILE_OVERLAP", "128"))
+    INFERENCE_TILED_MODELS: list = [name.strip() for name in os.getenv("INFERENCE_TILED_MODELS", "anomalies").split(",") if name.strip()]
+    INFERENCE_TILE_NMS_THRESHOLD: float = float(os.getenv("INFERENCE_TILE_NMS_THRESHOLD", "0.6"))
+
+    # Where /upload keeps reports for /report: "memory" (per worker) or "sqlite" (shared)
+    REPORT_STORE: str = os.getenv("REPORT_STORE", "memory")
+    REPORT_STORE_PATH: str = os.getenv("REPORT_STORE_PATH", "data/reports.db")
+    REPORT_TTL_SECONDS: int = int(os.getenv("REPORT_TTL_SECONDS", "3600"))
+    REPORT_STORE_MAX_ENTRIES: int = int(os.getenv("REPORT_STORE_MAX_ENTRIES", "1000"))
+
+    # Content-addressed cache of /upload results; leave RESULT_CACHE_DIR empty for memory only
+    RESULT_CACHE_MAX_MB: int = int(os.getenv("RESULT_CACHE_MAX_MB", "64"))
+    RESULT_CACHE_DIR: str = os.getenv("RESULT_CACHE_DIR", "")
+    RESULT_CACHE_DISK_MAX_MB: int = int(os.getenv("RESULT_CACHE_DISK_MAX_MB", "512"))
+
+    # /upload image I/O: output format ("jpeg", "webp", "png" or "json" for no image), encoder
+    # quality (95 matches OpenCV's JPEG default; 85 makes much smaller files), largest decode
+    # downscale for big radiographs (1, 2, 4 or 8) and request size limit
+    UPLOAD_FORMAT: str = os.getenv("UPLOAD_FORMAT", "jpeg")
+    UPLOAD_QUALITY: int = int(os.getenv("UPLOAD_QUALITY", "95"))
+    UPLOAD_DECODE_REDUCTION: int = int(os.getenv("UPLOAD_DECODE_REDUCTION", "1"))
+    MAX_CONTENT_LENGTH: int = int(os.getenv("UPLOAD_MAX_MB", "32")) * 1024 * 1024
+
+    # POST /radiographs/bulk: request size limit, concurrent storage uploads and rows per insert
+    BULK_UPLOAD_MAX_MB: int = int(os.getenv("BULK_UPLOAD_MAX_MB", "1024"))
+    BULK_UPLOAD_CONCURRENCY: int = int(os.getenv("BULK_UPLOAD_CONCURRENCY", "8"))
+    BULK_INSERT_BATCH_SIZE: int = int(os.getenv("BULK_INSERT_BATCH_SIZE", "100"))
+
+    # Derived images stored next to each radiograph: web preview and list thumbnail (long side in
+    # pixels), their format ("webp" or progressive "jpeg") and quality; scripts/backfill_derivatives.py
+    PREVIEW_MAX_SIZE: int = int(os.getenv("PREVIEW_MAX_SIZE", "1600"))
+    THUMBNAIL_SIZE: int = int(os.getenv("THUMBNAIL_SIZE", "256"))
+    DERIVATIVE_FORMAT: str = os.getenv("DERIVATIVE_FORMAT", "webp")
+    DERIVATIVE_QUALITY: int = int(os.getenv("DERIVATIVE_QUALITY", "80"))
+
+    # Worker processes for the asynchronous POST /analyze job API
+    ANALYSIS_WORKERS: int = int(os.getenv("ANALYSIS_WORKERS", "1"))
+
+    # "eager" (load models at import, network clients after fork), "background" (prewarm in a thread) or "lazy"
+    STARTUP_MODE: str = os.getenv("STARTUP_MODE", "background")
+
+    # Pooled Supabase clients per worker (services/supabase_client.py)
+    SUPABASE_POOL_SIZE: int = int(os.getenv("SUPABASE_POOL_SIZE", "4"))
+    SUPABASE_POOL_TIMEOUT: float = float(os.getenv("SUPABASE_POOL_TIMEOUT", "10"))
+    SUPABASE_TIMEOUT: float = float(os.getenv("SUPABASE_TIMEOUT", "30"))
+    SUPABASE_STORAGE_TIMEOUT: float = float(os.getenv("SUPABASE_STORAGE_TIMEOUT", "60"))
+
+    # GET /patients and /radiographs: keyset page sizes and the per-user cache of pages (per worker)
+    LIST_PAGE_SIZE: int = int(os.getenv("LIST_PAGE_SIZE", "100"))
+    LIST_MAX_PAGE_SIZE: int = int(os.getenv("LIST_MAX_PAGE_SIZE", "500"))
+    LIST_CACHE_TTL_SECONDS: int = int(os.getenv("LIST_CACHE_TTL_SECONDS", "15"))
+    LIST_CACHE_MAX_ENTRIES: int = int(os.getenv("LIST_CACHE_MAX_ENTRIES", "1000"))
+
+    # Optional OpenAI-compatible chat completion server instead of the novita provider
+    CHAT_BASE_URL: str = os.getenv("CHAT_BASE_URL", "")
+
+    # Retrieval cache for /chat (services/retrieval_cache.py)
+    RETRIEVAL_EMBEDDING_CACHE_SIZE: int = int(os.getenv("RETRIEVAL_EMBEDDING_CACHE_SIZE", "1024"))
+    RETRIEVAL_RESULT_CACHE_SIZE: int = int(os.getenv("RETRIEVAL_RESULT_CACHE_SIZE", "512"))
+    RETRIEVAL_VERSION_TTL_SECONDS: int = int(os.getenv("RETRIEVAL_VERSION_TTL_SECONDS", "60"))
+
+    # Knowledge base search for /chat: "qdrant" (remote cluster) or "local" (in-process index)
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "qdrant")
+    LOCAL_INDEX_DIR: str = os.getenv("LOCAL_INDEX_DIR", "data/knowledge_base")
+
+    # Approximate token budgets for the parts of the /chat system prompt
+    CHAT_HISTORY_TOKENS: int = int(os.getenv("CHAT_HISTORY_TOKENS", "800"))
+    CHAT_CONTEXT_TOKENS: int = int(os.getenv("CHAT_CONTEXT_TOKENS", "1200"))
+    CHAT_REPORT_TOKENS: int = int(os.getenv("CHAT_REPORT_TOKENS", "400"))
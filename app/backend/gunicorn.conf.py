@@ -0,0 +1,69 @@
+# Production serving profile: gunicorn -c gunicorn.conf.py app:app
+import multiprocessing
+import os
+import sys
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+workers = int(os.environ.get("WEB_CONCURRENCY", max(1, multiprocessing.cpu_count())))
+# Threads per worker let concurrent uploads meet in the inference engine's micro-batches
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+
+# With STARTUP_MODE=eager, app.py loads the detectors and embedding model once in
+# the master and the forked workers share those pages copy-on-write; network
+# clients (Qdrant, the chat model) are built in each worker after fork. Otherwise
+# each worker imports the app itself and prewarms after fork (threads do not
+# survive fork), which boots faster on scale-to-zero machines.
+os.environ.setdefault("STARTUP_MODE", "eager")
+preload_app = os.environ["STARTUP_MODE"] == "eager"
+
+# The master only loads the weights: the warm-up pass would start torch's thread
+# pools, which are not fork-safe, so each worker runs it in post_fork instead
+warmup_models = os.environ.get("WARMUP_MODELS", "true").lower() == "true"
+if preload_app:
+    os.environ["WARMUP_MODELS"] = "false"
+
+# Workers must agree on /report and /upload/cache answers: share reports through SQLite
+os.environ.setdefault("REPORT_STORE", "sqlite")
+
+# Split the cores between workers so PyTorch does not oversubscribe the CPU.
+# Set before app.py imports torch, so every thread pool it starts uses it.
+torch_threads = int(os.environ.get("TORCH_THREADS", max(1, multiprocessing.cpu_count() // workers)))
+os.environ.setdefault("OMP_NUM_THREADS", str(torch_threads))
+os.environ.setdefault("MKL_NUM_THREADS", str(torch_threads))
+# Same split for exported models on ONNX Runtime / OpenVINO
+os.environ.setdefault("MODEL_THREADS", str(torch_threads))
+
+# Workers share annotated images through the result cache's disk tier, so
+# /analyze/<id>/image works whichever worker ran the job
+os.environ.setdefault("RESULT_CACHE_DIR", "data/result_cache")
+
+# The listing cache is per worker and only sees other workers' writes on expiry
+os.environ.setdefault("LIST_CACHE_TTL_SECONDS", "5")
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Only PyTorch detectors import torch; the ONNX Runtime / OpenVINO path never does
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(torch_threads)
+        server.log.info(f"Worker {worker.pid} using {torch_threads} torch thread(s)")
+
+    if preload_app and warmup_models:
+        # Processes spawned by this worker (the /analyze pool) warm their own models again
+        os.environ["WARMUP_MODELS"] = "true"
+        from services.model_registry import model_registry
+        model_registry.warmup()
+
+    if preload_app:
+        # Their connections must belong to this worker, not be inherited from the master
+        from services import startup
+        startup.prewarm_after_fork()
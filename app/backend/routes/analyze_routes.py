@@ -0,0 +1,86 @@
+from flask import Blueprint, Response, request, jsonify, send_file
+from io import BytesIO
+import json
+import time
+from services.jobs import job_queue, DONE, FAILED
+from services.report_store import report_store
+from services.result_cache import result_cache
+
+analyze_blueprint = Blueprint('analyze', __name__)
+
+
+def job_payload(job):
+    payload = {"id": job["id"], "status": job["status"]}
+    if job["status"] == DONE:
+        payload["report"] = report_store.get(job["id"])
+    elif job["status"] == FAILED:
+        payload["error"] = job["error"]
+    return payload
+
+
+# Enqueue a radiograph for analysis and return immediately
+@analyze_blueprint.route('/analyze', methods=['POST'])
+def create_analysis():
+    if 'file' not in request.files:
+        return jsonify({"error": "No file part"}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "No selected file"}), 400
+
+    try:
+        job_id = job_queue.submit(file.read())
+        return jsonify({"id": job_id, "status": job_queue.get(job_id)["status"]}), 202
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@analyze_blueprint.route('/analyze/<job_id>', methods=['GET'])
+def get_analysis(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job_payload(job)), 200
+
+
+# Server-sent events: one message per status change until the job finishes
+@analyze_blueprint.route('/analyze/<job_id>/events', methods=['GET'])
+def stream_analysis(job_id):
+    if job_queue.get(job_id) is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    def events():
+        last_status = None
+        while True:
+            job = job_queue.get(job_id)
+            if job is None:
+                yield f"event: error\ndata: {json.dumps({'error': 'Job expired'})}\n\n"
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield f"data: {json.dumps(job_payload(job))}\n\n"
+            if last_status in (DONE, FAILED):
+                return
+            time.sleep(0.25)
+
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
+@analyze_blueprint.route('/analyze/<job_id>/image', methods=['GET'])
+def get_analysis_image(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] != DONE:
+        return jsonify({"error": "Analysis not finished", "status": job["status"]}), 409
+
+    analysis = result_cache.get(job["cache_key"])
+    if analysis is None:
+        return jsonify({"error": "Annotated image no longer available"}), 410
+
+    return send_file(
+        BytesIO(analysis["image"]),
+        mimetype='image/jpeg',
+        as_attachment=False,
+        download_name='annotated_image.jpg'
+    )
@@ -1,18 +1,10 @@
-from flask import Blueprint, request, jsonify, current_app
-from supabase import create_client, Client
-import datetime
-import jwt
+from flask import Blueprint, request, jsonify
+from services.supabase_client import get_supabase_client, get_auth_client
+from services.auth import cached_row, current_identity, identity_cache, issue_token
 
 
 auth_blueprint = Blueprint('auth', __name__)
 
-# Function to get Supabase client
-def get_supabase_client():
-    url = current_app.config["SUPABASE_URL"]
-    key = current_app.config["SUPABASE_KEY"]
-    supabase: Client = create_client(url, key)
-    return supabase
-
 @auth_blueprint.route('/signup', methods=['POST'])
 def signup():
     request_data = request.get_json()
@@ -22,21 +14,22 @@ def signup():
     password = request_data.get('password')
     fullname = request_data.get('fullname')
     role = request_data.get('role', 'user')
+    patient_id = None
 
     if not email or not password or not fullname:
         return jsonify({"error": "Email, password or fullname missing."}), 400
 
     try:
         # Call Supabase API to sign up the user
-        supabase = get_supabase_client()
+        supabase = get_auth_client()
 
         if role == 'patient':
             # 1. Check if patient exists
-            patient_response = supabase.table('Patients').select('id').eq('email', email).single().execute()
+            patient = cached_row(supabase, 'Patients', 'email', email)
 
-            if not patient_response.data:
+            if not patient:
                 return {"error": "No existing patient record found. Please contact your doctor."}, 400
-            patient_id = patient_response.data['id']
+            patient_id = patient['id']
 
         response = supabase.auth.sign_up({
             "email": email,
@@ -48,21 +41,16 @@ def signup():
         if user:
             user_id = user.id
             # Insert user info into the 'Users' table
-            supabase.table('Users').insert({
+            inserted = supabase.table('Users').insert({
                 "fullname": fullname,
                 "role": role,
                 "user_id": user_id,
                 "email": email,
             }).execute()
+            users_id = inserted.data[0].get('id') if inserted.data else None
 
-            # Create JWT Token for new user with fullname and role
-            payload = {
-                "user_id": user.id,
-                "fullname": fullname,
-                "role": role,
-                "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=1),  # Token expires in 1 hour
-            }
-            token = jwt.encode(payload, current_app.config["JWT_SECRET_KEY"], algorithm="HS256")
+            # Create JWT Token for new user with its identity and role
+            token = issue_token(user.id, users_id, fullname, role, patient_id)
 
             return jsonify({
                 "message": "User created and logged in successfully",
@@ -88,7 +76,7 @@ def signin():
 
     try:
         # Call Supabase API to sign in the user
-        supabase = get_supabase_client()
+        supabase = get_auth_client()
         response = supabase.auth.sign_in_with_password({
             "email": email,
             "password": password,
@@ -97,28 +85,23 @@ def signin():
         user = response.user
         if user:
             user_id = user.id
-            user_data = supabase.table('Users').select('fullname', 'role', 'id').eq('user_id', user_id).single().execute()
+            # Repeated sign-ins find the user and patient rows in the identity cache
+            user_row = cached_row(supabase, 'Users', 'user_id', user_id)
             patient_id = None
-            if user_data.model_validate:
-                fullname = user_data.data.get('fullname')
-                role = user_data.data.get('role')
+            if user_row:
+                fullname = user_row.get('fullname')
+                role = user_row.get('role')
 
                 if role == 'patient':
-                    patient_response = supabase.table('Patients').select('id').eq('email', email).single().execute()
-                    if patient_response.data:
-                        patient_id = patient_response.data.get('id')
+                    patient = cached_row(supabase, 'Patients', 'email', email)
+                    if patient:
+                        patient_id = patient.get('id')
 
-                payload = {
-                    "user_id": user.id,
-                    "fullname": fullname,
-                    "role": role,
-                    "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=1),  # Token expires in 1 hour
-                }
-                token = jwt.encode(payload, current_app.config["JWT_SECRET_KEY"], algorithm="HS256")
+                token = issue_token(user.id, user_row.get('id'), fullname, role, patient_id)
                 return jsonify({
                     "message": "Login successful",
                     "token": token,
-                    "user_id": user_data.data.get('id'),
+                    "user_id": user_row.get('id'),
                     "role": role,
                     **({"patient_id": patient_id} if patient_id else {})
                 }), 200
@@ -132,7 +115,7 @@ def signin():
 def logout():
     try:
         # Supabase provides a `sign_out()` function to revoke the current session
-        supabase = get_supabase_client()
+        supabase = get_auth_client()
         supabase.auth.sign_out()
         
         return jsonify({"message": "User successfully logged out."}), 200
@@ -143,17 +126,18 @@ def logout():
 @auth_blueprint.route('/get_user', methods=['POST'])
 def get_user():
     try:
-        request_data = request.get_json()
-        user_id = request_data.get("user_id")
+        request_data = request.get_json(silent=True) or {}
+        # A signed-in caller may leave out its own ID
+        identity = current_identity()
+        user_id = request_data.get("user_id") or (identity.user_id if identity else None)
 
         if not user_id:
             return jsonify({"error": "Missing user_id"}), 400
 
-        supabase = get_supabase_client()
-        response = supabase.table("Users").select("*").eq("id", user_id).single().execute()
+        user = cached_row(get_supabase_client(), "Users", "id", user_id)
 
-        if response.data:
-            return jsonify({"user": response.data}), 200
+        if user:
+            return jsonify({"user": user}), 200
         else:
             return jsonify({"error": "User not found"}), 404
 
@@ -172,6 +156,8 @@ def update_user(user_id):
         response = supabase.table("Users").update({"fullname": fullname}).eq("id", user_id).execute()
 
         if response.data:
+            for user in response.data:
+                identity_cache.invalidate("Users", user)
             return jsonify({"message": "User updated successfully"}), 200
         else:
             return jsonify({"error": "User not found"}), 404
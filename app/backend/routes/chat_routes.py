@@ -0,0 +1,124 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+import json
+from services.knowledge_base import inference_client, MODEL
+from services.retrieval_cache import retrieval_cache
+from services.anomaly_snippets import anomaly_snippets
+from services.prompt_budget import prompt_budget
+from services.findings import patient_summary, summary_report, summary_text
+from services.supabase_client import pooled_client
+
+chat_blueprint = Blueprint('chat', __name__)
+
+
+def build_messages(user_message, chat_history, report, report_text=None):
+    # Questions about the anomalies in the report use passages precomputed at ingest;
+    # only off-report questions need a vector search
+    context_chunks = anomaly_snippets.context_for(user_message, report, retrieval_cache.collection_version())
+    if context_chunks is None:
+        context_docs = retrieval_cache.similarity_search(user_message, k=3)
+        context_chunks = [doc.page_content for doc in context_docs]
+
+    # Construct the prompt with history, report and context trimmed to their token budgets
+    history_context, report_context, context = prompt_budget.assemble(
+        chat_history, report if report_text is None else report_text, context_chunks
+    )
+
+    system_prompt = (
+        "You are a Dental anomaly expert. Your role is to help people understand dental anomalies and help them with their queries. "
+        "You should answer questions related to dental anomalies, treatments, and general dental health. "
+        "and provide accurate and helpful answers to their questions. Based on the chat history create a new question, answer it and dont show the question"
+        "The report contains information about detected anomalies in the uploaded dental radiograph or in all the radiographs of the patient. Use the report to connect the question with the patiens anomalies. "
+        "For example, if the question is about a specific problem like 'What is the treatment for caries?', and the report indicates that caries was detected in tooth 12, you can mention that in your answer. "
+        "If the problem does not appear in the report, you can still specify that the problem was not detected in the report. "
+        "Keep the answers short and concise. Use the following context to assist:\n\n"
+        f"{context}\n\n"
+        f"Conversation History:\n{history_context}\n\n"
+        f"Question: {user_message}\n\n"
+        f"Report: {report_context}\n\n"
+        "Answer:"
+    )
+
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_message},
+    ]
+
+
+def complete(messages):
+    completion = inference_client.get().chat.completions.create(model=MODEL, messages=messages)
+    return completion.choices[0].message.content
+
+
+def stream_tokens(messages):
+    """Yield the answer token by token; closing the generator aborts the upstream request."""
+    stream = inference_client.get().chat.completions.create(model=MODEL, messages=messages, stream=True)
+    try:
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+
+
+def sse_event(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+@chat_blueprint.route('/chat', methods=['POST'])
+def chat():
+    user_message = request.json.get('message', '')
+    chat_history = request.json.get('history', [])  # Retrieve chat history
+    report = request.json.get('report', None)  # Retrieve report if available
+    patient_id = request.json.get('patient_id')
+    stream = request.json.get('stream', False) or request.args.get('stream') == 'true'
+
+    report_text = None
+    if patient_id:
+        # The patient's whole history, summarized per tooth, instead of every report in full.
+        # The client goes back to the pool now, not after a possibly long answer stream.
+        try:
+            with pooled_client() as supabase:
+                summaries = patient_summary(supabase, patient_id)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+        report, report_text = summary_report(summaries), summary_text(summaries)
+
+    messages = build_messages(user_message, chat_history, report, report_text)
+
+    if not stream:
+        return jsonify({"response": complete(messages)})
+
+    # Server-sent events: one "data" message per token, then "done" with the full answer.
+    # If the client disconnects, the WSGI server closes this generator, which closes
+    # stream_tokens and with it the upstream completion request.
+    def events():
+        tokens = stream_tokens(messages)
+        answer = []
+        try:
+            for token in tokens:
+                answer.append(token)
+                yield sse_event({"token": token})
+            yield sse_event({"response": "".join(answer)}, event="done")
+        except Exception as e:
+            yield sse_event({"error": str(e)}, event="error")
+        finally:
+            tokens.close()
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@chat_blueprint.route('/chat/cache', methods=['GET'])
+def chat_cache_stats():
+    return jsonify({**retrieval_cache.stats(), **anomaly_snippets.stats()})
+
+
+@chat_blueprint.route('/chat/prompt-stats', methods=['GET'])
+def chat_prompt_stats():
+    return jsonify(prompt_budget.stats())
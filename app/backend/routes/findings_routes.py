@@ -0,0 +1,45 @@
+from flask import Blueprint, request, jsonify
+from datetime import datetime
+from services.supabase_client import get_supabase_client
+from services.findings import new_findings, patient_summary, tooth_history
+from services.listing import cached_listing
+from services.tooth_assignment import NUM_TEETH
+
+findings_blueprint = Blueprint('findings', __name__)
+
+
+# Per-patient anomaly summary, or with ?since=<ISO date> only the findings first seen after it
+@findings_blueprint.route('/patients/<int:patient_id>/findings', methods=['GET'])
+def get_findings(patient_id):
+    since = request.args.get('since')
+    if since:
+        try:
+            datetime.fromisoformat(since.replace('Z', '+00:00'))
+        except ValueError:
+            return jsonify({"error": "since must be an ISO date"}), 400
+
+    def load():
+        supabase = get_supabase_client()
+        if since:
+            return {"patient_id": patient_id, "since": since, "findings": new_findings(supabase, patient_id, since)}
+        return {"patient_id": patient_id, "findings": patient_summary(supabase, patient_id)}
+
+    try:
+        return cached_listing('findings', patient_id, ('summary', since), load)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# Findings of one tooth across the patient's radiographs, oldest first
+@findings_blueprint.route('/patients/<int:patient_id>/teeth/<int:tooth>/history', methods=['GET'])
+def get_tooth_history(patient_id, tooth):
+    if not 1 <= tooth <= NUM_TEETH:
+        return jsonify({"error": f"tooth must be between 1 and {NUM_TEETH}"}), 400
+
+    def load():
+        return {"patient_id": patient_id, "tooth": tooth, "history": tooth_history(get_supabase_client(), patient_id, tooth)}
+
+    try:
+        return cached_listing('findings', patient_id, ('tooth', tooth), load)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
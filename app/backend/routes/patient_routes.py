@@ -1,14 +1,13 @@
-from flask import Blueprint, request, jsonify, current_app
-from supabase import create_client
+from flask import Blueprint, request, jsonify
+from services.supabase_client import get_supabase_client
+from services.auth import cached_row, current_identity, identity_cache
+from services.listing import ListingError, cached_listing, keyset_page, listing_cache, parse_fields, parse_limit
 
 
 patient_blueprint = Blueprint('patient', __name__)
 
-# Function to get Supabase client
-def get_supabase_client():
-    url = current_app.config["SUPABASE_URL"]
-    key = current_app.config["SUPABASE_KEY"]
-    return create_client(url, key)
+# Keyset order of GET /patients: oldest first, by ID
+PATIENT_ORDER = [('id', False)]
 
 # CRUD API to create a new patient
 @patient_blueprint.route('/patients', methods=['POST'])
@@ -38,6 +37,7 @@ def create_patient():
 
         if not response.data:
             return jsonify({"error": "Failed to create patient"}), 400
+        listing_cache.invalidate('patients', user_id)
         return jsonify({"message": "Patient created successfully", "data": response.data}), 201
 
 
@@ -45,23 +45,34 @@ def create_patient():
         return jsonify({"error": str(e)}), 500
 
 
-# CRUD API to get all patients
+# CRUD API to get a doctor's patients, one page at a time
 @patient_blueprint.route('/patients', methods=['GET'])
 def get_patients():
-    user_id = request.args.get('user_id')
+    # A signed-in doctor may leave out its own ID
+    identity = current_identity()
+    user_id = request.args.get('user_id') or (identity.user_id if identity else None)
 
     if not user_id:
         return jsonify({"error": "User ID is required"}), 400
 
     try:
-        #TODO: Fetch patients by user_id; Now all are fetched
+        fields = parse_fields(request.args.get('fields'), required=[column for column, _ in PATIENT_ORDER])
+        limit = parse_limit(request.args.get('limit'))
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
+    cursor = request.args.get('cursor')
+
+    def load():
         supabase = get_supabase_client()
-        response = supabase.table('Patients').select('*').eq("user_id", user_id).execute()
+        query = supabase.table('Patients').select(fields).eq("user_id", user_id)
+        patients, next_cursor = keyset_page(query, PATIENT_ORDER, cursor, limit)
+        return {"patients": patients, "next_cursor": next_cursor}
 
-        if not response.data:
-            return jsonify({"error": "Failed to fetch patients"}), 400
-        return jsonify({"patients": response.data}), 200
+    try:
+        return cached_listing('patients', user_id, (fields, limit, cursor), load)
 
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -70,12 +81,11 @@ def get_patients():
 @patient_blueprint.route('/patients/<int:patient_id>', methods=['GET'])
 def get_patient(patient_id):
     try:
-        supabase = get_supabase_client()
-        response = supabase.table('Patients').select('*').eq('id', patient_id).single().execute()
+        patient = cached_row(get_supabase_client(), 'Patients', 'id', patient_id)
 
-        if not response.data:
+        if not patient:
             return jsonify({"error": "Patient not found"}), 404
-        return jsonify({"patient": response.data}), 200
+        return jsonify({"patient": patient}), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -108,6 +118,9 @@ def update_patient(patient_id):
 
         if not response.data:
             return jsonify({"error": "Failed to update patient"}), 400
+        for patient in response.data:
+            listing_cache.invalidate('patients', patient.get('user_id'))
+            identity_cache.invalidate('Patients', patient)
         return jsonify({"message": "Patient updated successfully", "data": response.data}), 200
 
     except Exception as e:
@@ -124,6 +137,9 @@ def delete_patient(patient_id):
 
         if not response.data:
             return jsonify({"error": "Failed to delete patient"}), 400
+        for patient in response.data:
+            listing_cache.invalidate('patients', patient.get('user_id'))
+            identity_cache.invalidate('Patients', patient)
         return jsonify({"message": "Patient deleted successfully"}), 200
 
     except Exception as e:
@@ -1,15 +1,17 @@
-from flask import Blueprint, request, jsonify, current_app
-from supabase import create_client, Client
+from flask import Blueprint, request, jsonify
+import zipfile
+from config import Config
+from services.supabase_client import get_supabase_client
+from services.findings import forget_findings, record_findings
+from services.derivatives import derivative_files, storage_path, store_derivatives
+from services.bulk_upload import BulkUploader, CREATED, iter_archive, iter_files, parse_metadata
+from services.listing import ListingError, cached_listing, keyset_page, listing_cache, parse_fields, parse_limit
 import re
 
 radiograph_blueprint = Blueprint('radiograph', __name__)
 
-# Function to get Supabase client
-def get_supabase_client():
-    url = current_app.config["SUPABASE_URL"]
-    key = current_app.config["SUPABASE_KEY"]
-    supabase: Client = create_client(url, key)
-    return supabase
+# Keyset order of GET /radiographs: newest first
+RADIOGRAPH_ORDER = [('date', True), ('id', True)]
 
 @radiograph_blueprint.route('/radiographs', methods=['POST'])
 def create_radiograph():
@@ -41,6 +43,13 @@ def create_radiograph():
         # Get the public URL of the uploaded image
         public_url = supabase.storage.from_("radiographs").get_public_url(file_name)
 
+        # Web preview and list thumbnail; scripts/backfill_derivatives.py fills them in if this fails
+        try:
+            derivatives = store_derivatives(supabase, file_name, image_data)
+        except Exception as e:
+            print(f"Failed to store radiograph derivatives: {e}")
+            derivatives = {}
+
         # Save metadata to the Radiographs table
         print("Saving metadata to Supabase database")
         db_response = supabase.table('Radiographs').insert({
@@ -48,10 +57,18 @@ def create_radiograph():
             "url": public_url,
             "report": report,
             "date": date,
+            **derivatives,
         }).execute()
 
         if not db_response.data:
             return jsonify({"error": "Failed to save radiograph metadata"}), 500
+        listing_cache.invalidate('radiographs', patient_id)
+
+        # Per-tooth findings for the patient's history; scripts/backfill_findings.py rebuilds them if this fails
+        try:
+            record_findings(supabase, db_response.data)
+        except Exception as e:
+            print(f"Failed to record radiograph findings: {e}")
 
         return jsonify({"message": "Radiograph saved successfully", "data": db_response.data}), 200
 
@@ -59,7 +76,55 @@ def create_radiograph():
         return jsonify({"error": str(e)}), 500
 
 
-# CRUD API to get all patients
+# Store many radiographs in one request: multipart `images` files or a zip `archive`
+@radiograph_blueprint.route('/radiographs/bulk', methods=['POST'])
+def create_radiographs_bulk():
+    # An archive migration is far larger than a single upload
+    request.max_content_length = Config.BULK_UPLOAD_MAX_MB * 1024 * 1024
+
+    try:
+        # Optional per-file fields: {"<filename>": {"patient_id": ..., "date": ..., "report": ...}}
+        metadata = parse_metadata(request.form.get('metadata'))
+    except ValueError:
+        return jsonify({"error": "metadata must be a JSON object of filename -> object"}), 400
+    defaults = {
+        "patient_id": request.form.get('patient_id'),
+        "date": request.form.get('date'),
+        "report": request.form.get('report'),
+    }
+    analyze = request.form.get('analyze', 'false').lower() == 'true'
+
+    archive = request.files.get('archive')
+    images = request.files.getlist('images')
+    if not archive and not images:
+        return jsonify({"error": "No images or archive"}), 400
+
+    try:
+        # Each image is capped at the single /upload size, however small its compressed entry
+        uploads = iter_archive(archive.stream, Config.MAX_CONTENT_LENGTH) if archive else iter_files(images)
+        uploader = BulkUploader(
+            get_supabase_client(),
+            concurrency=Config.BULK_UPLOAD_CONCURRENCY,
+            batch_size=Config.BULK_INSERT_BATCH_SIZE,
+            analyze=analyze,
+        )
+        items = uploader.run(uploads, defaults, metadata)
+
+    except zipfile.BadZipFile:
+        return jsonify({"error": "archive is not a zip file"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    created = [item for item in items if item["status"] == CREATED]
+    for patient_id in {item["patient_id"] for item in created}:
+        listing_cache.invalidate('radiographs', patient_id)
+
+    # 207 Multi-Status: look at each item when only some were stored
+    status_code = 200 if len(created) == len(items) else 207
+    return jsonify({"created": len(created), "failed": len(items) - len(created), "items": items}), status_code
+
+
+# CRUD API to get a patient's radiographs, one page at a time
 @radiograph_blueprint.route('/radiographs', methods=['GET'])
 def get_radiographs():
     patient_id = request.args.get('patient_id')
@@ -68,13 +133,23 @@ def get_radiographs():
         return jsonify({"error": "Patient ID is required"}), 400
 
     try:
+        fields = parse_fields(request.args.get('fields'), required=[column for column, _ in RADIOGRAPH_ORDER])
+        limit = parse_limit(request.args.get('limit'))
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
+    cursor = request.args.get('cursor')
+
+    def load():
         supabase = get_supabase_client()
-        response = supabase.table('Radiographs').select('*').eq('patient_id', patient_id).execute()
+        query = supabase.table('Radiographs').select(fields).eq('patient_id', patient_id)
+        radiographs, next_cursor = keyset_page(query, RADIOGRAPH_ORDER, cursor, limit)
+        return {"patients": radiographs, "next_cursor": next_cursor}
 
-        if not response.data:
-            return jsonify({"patients": []}), 200
-        return jsonify({"patients": response.data}), 200
+    try:
+        return cached_listing('radiographs', patient_id, (fields, limit, cursor), load)
 
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -90,13 +165,10 @@ def delete_radiograph(radiograph_id):
             return jsonify({"error": "Radiograph not found"}), 404
 
         radiograph = radiograph_response.data[0]
-        file_url = radiograph['url']
-        file_name = file_url.split('/')[-1]  # Extract the file name from the URL
-        file_name = file_name.split('?')[0]  # Remove any query parameters if present
-        file_name = f"radiographs/{file_name}"  # Ensure the file name includes the storage path
+        file_name = storage_path(radiograph['url'])
 
         print(f"Deleting image from Supabase storage: {file_name}")
-        storage_response = supabase.storage.from_('radiographs').remove([file_name])
+        storage_response = supabase.storage.from_('radiographs').remove([file_name, *derivative_files(radiograph)])
         if not storage_response:
             return jsonify({"error": "Failed to delete image from storage"}), 500
 
@@ -105,6 +177,11 @@ def delete_radiograph(radiograph_id):
         db_response = supabase.table('Radiographs').delete().eq('id', radiograph_id).execute()
         if not db_response.data:
             return jsonify({"error": "Failed to delete radiograph metadata"}), 500
+        listing_cache.invalidate('radiographs', radiograph['patient_id'])
+        try:
+            forget_findings(supabase, radiograph)
+        except Exception as e:
+            print(f"Failed to remove radiograph findings: {e}")
 
         return jsonify({"message": "Radiograph deleted successfully"}), 200
 
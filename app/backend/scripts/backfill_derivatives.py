@@ -0,0 +1,70 @@
+"""
+Generates the web preview and list thumbnail of radiographs stored before
+derivatives existed (or whose generation failed on save), and records their
+URLs on the Radiographs rows.
+
+Rows without a preview_url are walked in ID order one page at a time; the
+originals of a page are downloaded, converted and uploaded on a thread pool.
+Derivatives are overwritten, so the job can be interrupted and run again.
+
+Run from app/backend (needs SUPABASE_URL and SUPABASE_KEY):
+    python scripts/backfill_derivatives.py --batch-size 50 --concurrency 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from supabase import create_client
+from config import Config
+from services.derivatives import storage_path, store_derivatives
+
+
+def backfill_row(supabase, row, dry_run=False):
+    path = storage_path(row["url"])
+    original = supabase.storage.from_("radiographs").download(path)
+    if dry_run:
+        return len(original)
+    columns = store_derivatives(supabase, path, original)
+    supabase.table('Radiographs').update(columns).eq('id', row["id"]).execute()
+    return len(original)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=50, help="rows fetched per page")
+    parser.add_argument("--concurrency", type=int, default=8, help="radiographs converted at once")
+    parser.add_argument("--limit", type=int, default=0, help="stop after this many rows (0 = all)")
+    parser.add_argument("--dry-run", action="store_true", help="only download the originals")
+    args = parser.parse_args()
+
+    supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+    done, failed, downloaded = 0, 0, 0
+    last_id = None
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        while not args.limit or done + failed < args.limit:
+            # Keyset on ID: rows that keep failing are not fetched again in this run
+            query = supabase.table('Radiographs').select('id,url').is_('preview_url', 'null')
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            page_size = args.batch_size if not args.limit else min(args.batch_size, args.limit - done - failed)
+            rows = query.order('id').limit(page_size).execute().data or []
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+
+            futures = [(row, pool.submit(backfill_row, supabase, row, args.dry_run)) for row in rows]
+            for row, future in futures:
+                try:
+                    downloaded += future.result()
+                    done += 1
+                except Exception as e:
+                    failed += 1
+                    print(f"radiograph {row['id']}: {e}")
+            elapsed = time.perf_counter() - start
+            print(f"{done} done, {failed} failed, {downloaded / 1e6:.1f} MB of originals, {done / elapsed:.1f} rows/s")
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,62 @@
+"""
+Rebuilds the normalized per-tooth findings (Findings) and the per-patient
+summaries (FindingSummaries) from the reports already stored on Radiographs.
+
+Radiographs are read in ID order one page at a time; the findings of each
+page replace whatever was stored for those radiographs, so the job can be
+interrupted and run again. The summaries of every patient seen are then
+recomputed from their findings.
+
+Run from app/backend (needs SUPABASE_URL and SUPABASE_KEY):
+    python scripts/backfill_findings.py --batch-size 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from supabase import create_client
+from config import Config
+from services.findings import FINDINGS_TABLE, normalize_report, rebuild_summaries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=200, help="radiographs read per page")
+    parser.add_argument("--patient", action="append", help="only this patient (repeatable)")
+    args = parser.parse_args()
+
+    supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+    start = time.perf_counter()
+    radiographs, findings = 0, 0
+    patients = set()
+    last_id = None
+    while True:
+        query = supabase.table('Radiographs').select('id,patient_id,date,report')
+        if args.patient:
+            query = query.in_('patient_id', args.patient)
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        rows = query.order('id').limit(args.batch_size).execute().data or []
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+
+        new_rows = [
+            {"radiograph_id": row["id"], "patient_id": row["patient_id"], "tooth": tooth, "anomaly": anomaly, "date": row["date"]}
+            for row in rows
+            for tooth, anomaly in normalize_report(row["report"])
+        ]
+        supabase.table(FINDINGS_TABLE).delete().in_('radiograph_id', [row["id"] for row in rows]).execute()
+        if new_rows:
+            supabase.table(FINDINGS_TABLE).insert(new_rows).execute()
+
+        radiographs += len(rows)
+        findings += len(new_rows)
+        patients.update(row["patient_id"] for row in rows)
+        print(f"{radiographs} radiographs, {findings} findings, {radiographs / (time.perf_counter() - start):.0f} radiographs/s")
+
+    for patient_id in sorted(patients):
+        rebuild_summaries(supabase, patient_id)
+    print(f"summaries rebuilt for {len(patients)} patients in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,112 @@
+"""
+Accuracy parity and latency/memory benchmark of one detector across backends.
+
+The first model is the reference (normally the PyTorch .pt weights). Every
+model runs in a fresh process over a fixture folder of radiographs; the report
+shows p50 latency per image, peak RSS added by loading and running the model,
+and recall/precision of its detections against the reference (same class,
+IoU above --iou). Exits non-zero if any backend's recall is below --min-recall.
+
+Run from app/backend:
+    python scripts/bench_backends.py fixtures/radiographs models/anomalies.pt models/anomalies.onnx \
+        models/anomalies.int8.onnx models/anomalies_openvino_model --threads 2
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+
+
+def as_array(values):
+    return np.asarray(values.cpu() if hasattr(values, 'cpu') else values)
+
+
+def run_model(path, runtime, threads, fixtures, repeat, results):
+    import cv2
+    from services.detectors import create_detector
+
+    images = [cv2.imread(image_path, cv2.IMREAD_COLOR) for image_path in fixtures]
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if path.endswith(".pt") and threads:
+        import torch
+        torch.set_num_threads(threads)
+    detector = create_detector(path, runtime, threads)
+    detector(images[0], verbose=False)  # warm-up
+
+    timings, detections = [], []
+    for image in images:
+        for attempt in range(repeat):
+            start = time.perf_counter()
+            result = detector([image], verbose=False)[0]
+            timings.append(time.perf_counter() - start)
+        detections.append((as_array(result.boxes.xyxy), as_array(result.boxes.conf), as_array(result.boxes.cls)))
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings.sort()
+    results.put((timings[len(timings) // 2] * 1000, (peak - baseline) / 1024, detections))
+
+
+def match(reference, candidate, iou_threshold):
+    """Recall, precision and mean score difference of `candidate` against `reference` for one image."""
+    from services.tooth_assignment import iou_matrix
+
+    ref_boxes, ref_conf, ref_cls = reference
+    boxes, conf, cls = candidate
+    if len(ref_boxes) == 0 or len(boxes) == 0:
+        same = len(ref_boxes) == len(boxes)
+        return (1.0 if same else 0.0), (1.0 if same else 0.0), []
+
+    matches = (iou_matrix(ref_boxes.astype(np.float64), boxes.astype(np.float64)) > iou_threshold) \
+        & (ref_cls[:, None] == cls[None, :])
+    recall = matches.any(axis=1).mean()
+    precision = matches.any(axis=0).mean()
+    score_diffs = [abs(ref_conf[i] - conf[matches[i].argmax()]) for i in np.flatnonzero(matches.any(axis=1))]
+    return recall, precision, score_diffs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("fixtures", help="folder of radiographs")
+    parser.add_argument("models", nargs="+", help="reference model first, then the exports to compare")
+    parser.add_argument("--runtime", default="onnxruntime", help="runtime for .onnx files: onnxruntime or openvino")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--iou", type=float, default=0.5)
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    args = parser.parse_args()
+
+    fixtures = sorted(
+        os.path.join(args.fixtures, name) for name in os.listdir(args.fixtures) if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+
+    reference = None
+    failed = False
+    print(f"{'model':<40}{'p50 ms':>9}{'peak RSS +MB':>15}{'recall':>9}{'precision':>11}{'mean |dconf|':>14}")
+    for path in args.models:
+        process = context.Process(target=run_model, args=(path, args.runtime, args.threads, fixtures, args.repeat, results))
+        process.start()
+        p50, rss, detections = results.get()
+        process.join()
+
+        if reference is None:
+            reference = detections
+        per_image = [match(ref, det, args.iou) for ref, det in zip(reference, detections)]
+        recall = np.mean([r for r, _, _ in per_image])
+        precision = np.mean([p for _, p, _ in per_image])
+        score_diffs = [d for _, _, diffs in per_image for d in diffs]
+        mean_diff = np.mean(score_diffs) if score_diffs else 0.0
+        failed |= recall < args.min_recall
+        print(f"{os.path.basename(path.rstrip('/')):<40}{p50:>9.1f}{rss:>15.1f}{recall:>9.3f}{precision:>11.3f}{mean_diff:>14.4f}")
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,144 @@
+"""
+Stores a batch of radiographs through POST /radiographs one by one and through
+POST /radiographs/bulk (multipart and zip), against local stand-ins for
+Supabase storage and PostgREST with an artificial round-trip latency, and
+checks that every item was stored and reported.
+
+Run from app/backend:
+    python scripts/bench_bulk_upload.py --images 100 --latency-ms 30
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("STARTUP_MODE", "lazy")
+
+import cv2
+import numpy as np
+from bench_supabase_client import fake_key
+
+
+class SupabaseStandIn(BaseHTTPRequestHandler):
+    """Just enough of storage (object upload/remove) and PostgREST (insert) for the radiograph routes."""
+
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+    latency = 0.0
+    lock = threading.Lock()
+    objects = {}
+    rows = []
+    round_trips = 0
+
+    def _reply(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self):
+        body = self._body()
+        time.sleep(self.latency)
+        with SupabaseStandIn.lock:
+            SupabaseStandIn.round_trips += 1
+            if self.path.startswith("/storage/v1/object/"):
+                SupabaseStandIn.objects[self.path] = len(body)
+                return self._reply({"Key": self.path})
+            if self.path.startswith("/rest/v1/Radiographs"):
+                new_rows = json.loads(body)
+                new_rows = new_rows if isinstance(new_rows, list) else [new_rows]
+                for row in new_rows:
+                    row["id"] = len(SupabaseStandIn.rows) + 1
+                    SupabaseStandIn.rows.append(row)
+                return self._reply(new_rows, 201)
+        self._reply({"error": "not found"}, 404)
+
+    def do_DELETE(self):
+        self._body()
+        self._reply([])
+
+    def log_message(self, *args):
+        pass
+
+
+def make_images(count):
+    # Small noisy stand-ins for radiographs, so timings reflect round trips rather than bytes
+    image = cv2.GaussianBlur((np.random.rand(256, 512) * 255).astype(np.uint8), (9, 9), 0)
+    encoded = cv2.imencode(".png", image)[1].tobytes()
+    return [(f"xray_{i:04d}.png", encoded) for i in range(count)]
+
+
+def reset():
+    SupabaseStandIn.objects = {}
+    SupabaseStandIn.rows = []
+    SupabaseStandIn.round_trips = 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=30)
+    args = parser.parse_args()
+
+    SupabaseStandIn.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SupabaseStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    import app as app_module
+    flask_app = app_module.app
+    flask_app.config["SUPABASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    flask_app.config["SUPABASE_KEY"] = fake_key()
+    client = flask_app.test_client()
+    images = make_images(args.images)
+    report = json.dumps({"1": []})
+
+    reset()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # the single-image route logs every step
+        for name, data in images:
+            response = client.post("/radiographs", data={
+                "patient_id": "1", "report": report, "date": "2024-01-01T00:00:00Z", "image": (io.BytesIO(data), name),
+            })
+            assert response.status_code == 200, response.json
+    single = time.perf_counter() - start
+    print(f"one request per image: {single:.2f}s, {SupabaseStandIn.round_trips} round trips, {len(SupabaseStandIn.rows)} rows")
+
+    reset()
+    start = time.perf_counter()
+    response = client.post("/radiographs/bulk", data={
+        "patient_id": "1", "report": report, "images": [(io.BytesIO(data), name) for name, data in images],
+    })
+    bulk = time.perf_counter() - start
+    assert response.status_code == 200 and response.json["created"] == args.images, response.json
+    print(f"bulk multipart:        {bulk:.2f}s, {SupabaseStandIn.round_trips} round trips, {len(SupabaseStandIn.rows)} rows")
+
+    reset()
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name, data in images:
+            zf.writestr(f"archive/{name}", data)
+    archive.seek(0)
+    metadata = {name: {"date": f"2023-01-{1 + i % 28:02d}T00:00:00Z"} for i, (name, _) in enumerate(images)}
+    metadata[images[0][0]] = {"patient_id": ""}  # one item without a patient, to see a per-item failure
+    start = time.perf_counter()
+    response = client.post("/radiographs/bulk", data={
+        "patient_id": "1", "report": report, "metadata": json.dumps(metadata), "archive": (archive, "archive.zip"),
+    })
+    bulk_zip = time.perf_counter() - start
+    assert response.status_code == 207 and response.json["failed"] == 1, response.json
+    print(f"bulk zip archive:      {bulk_zip:.2f}s, {SupabaseStandIn.round_trips} round trips, {len(SupabaseStandIn.rows)} rows, "
+          f"1 expected failure: {response.json['items'][0]['error']}")
+
+    server.shutdown()
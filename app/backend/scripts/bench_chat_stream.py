@@ -0,0 +1,110 @@
+"""
+Time-to-first-token harness for /chat against a local fake completion server.
+
+Starts an OpenAI-compatible server that emits --tokens tokens, one every
+--delay-ms, then compares the blocking completion with the streamed one and
+checks that closing the stream early (a client disconnect) stops generation.
+
+Run from app/backend:
+    python scripts/bench_chat_stream.py --tokens 60 --delay-ms 30
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeCompletionServer(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1  # one write per response/chunk (flushed explicitly)
+    tokens = 60
+    delay = 0.03
+    sent = []  # tokens sent per request, to detect early cancellation
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        words = [f"word{i} " for i in range(self.tokens)]
+
+        if not body.get("stream"):
+            time.sleep(self.delay * self.tokens)
+            payload = json.dumps({
+                "id": "fake", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "".join(words)}}],
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        sent = 0
+        try:
+            for word in words:
+                time.sleep(self.delay)
+                chunk = {
+                    "id": "fake", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                    "choices": [{"index": 0, "finish_reason": None, "delta": {"content": word}}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+                sent += 1
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            FakeCompletionServer.sent.append(sent)
+            self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=60)
+    parser.add_argument("--delay-ms", type=float, default=30)
+    args = parser.parse_args()
+
+    FakeCompletionServer.tokens = args.tokens
+    FakeCompletionServer.delay = args.delay_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeCompletionServer)
+    server.handle_error = lambda request, client_address: None  # cancelled streams break the pipe on purpose
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ["CHAT_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from routes.chat_routes import complete, stream_tokens
+
+    messages = [{"role": "user", "content": "What is caries?"}]
+
+    start = time.perf_counter()
+    complete(messages)
+    blocking = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first_token = None
+    for _ in stream_tokens(messages):
+        if first_token is None:
+            first_token = time.perf_counter() - start
+    streamed = time.perf_counter() - start
+
+    print(f"blocking:  first token after {blocking * 1000:.0f} ms (whole answer)")
+    print(f"streaming: first token after {first_token * 1000:.0f} ms, last after {streamed * 1000:.0f} ms")
+
+    # Simulate a client disconnect after a few tokens
+    tokens = stream_tokens(messages)
+    for _, _ in zip(range(3), tokens):
+        pass
+    tokens.close()
+    time.sleep(args.delay_ms / 1000 * 5)
+    print(f"cancelled stream: server sent {FakeCompletionServer.sent[-1]} of {args.tokens} tokens")
+    server.shutdown()
@@ -0,0 +1,59 @@
+"""
+Size and generation time of the radiograph derivatives (preview and
+thumbnail) against the originals, per derivative format.
+
+Uses the radiographs of a fixture folder, or a synthetic 3000x1500
+panoramic saved as PNG and JPEG when none is given.
+
+Run from app/backend:
+    python scripts/bench_derivatives.py --fixtures fixtures/radiographs
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from services.derivatives import DERIVATIVE_FORMATS, make_derivatives
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+
+
+def load_originals(folder):
+    if folder:
+        names = sorted(name for name in os.listdir(folder) if name.lower().endswith(IMAGE_EXTENSIONS))
+        return [(name, open(os.path.join(folder, name), "rb").read()) for name in names]
+    image = cv2.GaussianBlur((np.random.rand(1500, 3000) * 255).astype(np.uint8), (15, 15), 0)
+    return [("synthetic.png", cv2.imencode(".png", image)[1].tobytes()),
+            ("synthetic.jpg", cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 95])[1].tobytes())]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", help="folder of radiographs")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    originals = load_originals(args.fixtures)
+    original_bytes = sum(len(data) for _, data in originals)
+    print(f"{len(originals)} originals, {original_bytes / len(originals) / 1024:.0f} KB on average")
+    print(f"{'format':<8}{'p50 ms':>9}{'preview KB':>12}{'thumbnail KB':>14}{'list bytes saved':>18}")
+    for output_format in DERIVATIVE_FORMATS:
+        timings, preview_bytes, thumbnail_bytes = [], 0, 0
+        for _, data in originals:
+            for attempt in range(args.repeat):
+                start = time.perf_counter()
+                derivatives = make_derivatives(
+                    data, Config.PREVIEW_MAX_SIZE, Config.THUMBNAIL_SIZE, output_format, Config.DERIVATIVE_QUALITY
+                )
+                timings.append(time.perf_counter() - start)
+            preview_bytes += len(derivatives["preview"][0])
+            thumbnail_bytes += len(derivatives["thumbnail"][0])
+        timings.sort()
+        saved = 1 - thumbnail_bytes / original_bytes
+        print(f"{output_format:<8}{timings[len(timings) // 2] * 1000:>9.1f}{preview_bytes / len(originals) / 1024:>12.0f}"
+              f"{thumbnail_bytes / len(originals) / 1024:>14.1f}{saved:>18.1%}")
@@ -0,0 +1,63 @@
+"""
+Compares serialized per-image inference with the micro-batching InferenceEngine
+under a burst of concurrent requests.
+
+Run from app/backend:
+    python scripts/bench_inference.py path/to/radiograph.jpg --requests 16 --threads 4
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.model_registry import model_registry
+from services.inference_engine import InferenceEngine
+
+
+def run_serialized(image, requests, threads):
+    # What the Flask threads did before: one image at a time through PyTorch
+    lock = threading.Lock()
+
+    def work(_):
+        with lock:
+            model_registry.get('anomalies')(image, verbose=False)
+            model_registry.get('teeth')(image, verbose=False)
+
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(work, range(requests)))
+
+
+def run_batched(image, requests, threads, window_ms, max_batch):
+    engine = InferenceEngine(model_registry, window_ms=window_ms, max_batch=max_batch)
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(lambda _: engine.predict(image), range(requests)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("image")
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--window-ms", type=int, default=20)
+    parser.add_argument("--max-batch", type=int, default=4)
+    args = parser.parse_args()
+
+    image = cv2.imread(args.image, cv2.IMREAD_COLOR)
+    model_registry.load_all()
+
+    start = time.perf_counter()
+    run_serialized(image, args.requests, args.threads)
+    serialized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    run_batched(image, args.requests, args.threads, args.window_ms, args.max_batch)
+    batched = time.perf_counter() - start
+
+    print(f"serialized: {args.requests / serialized:.2f} images/sec ({serialized:.2f}s)")
+    print(f"batched:    {args.requests / batched:.2f} images/sec ({batched:.2f}s)")
@@ -0,0 +1,60 @@
+"""
+Compares services/jaw_partition.split_jaws with the KMeans(n_clusters=2) call
+that upload_image used to split upper and lower jaw, for agreement and speed.
+
+Run from app/backend (needs scikit-learn for the comparison):
+    python scripts/bench_jaw_partition.py --cases 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.jaw_partition import split_jaws
+
+
+def kmeans_upper_mask(KMeans, centers_y):
+    centers_y = np.asarray(centers_y).reshape(-1, 1)
+    labels = KMeans(n_clusters=2, random_state=0).fit(centers_y).labels_
+    upper_label = 0 if np.mean(centers_y[labels == 0]) < np.mean(centers_y[labels == 1]) else 1
+    return labels == upper_label
+
+
+def random_centers(rng):
+    upper = rng.normal(300, 40, int(rng.integers(1, 17)))
+    lower = rng.normal(700, 40, int(rng.integers(1, 17)))
+    return np.concatenate([upper, lower])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=200)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    from sklearn.cluster import KMeans
+    print(f"sklearn.cluster import: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = np.random.default_rng(0)
+    cases = [random_centers(rng) for _ in range(args.cases)]
+
+    agree = sum(np.array_equal(kmeans_upper_mask(KMeans, c), split_jaws(c)) for c in cases)
+    print(f"agreement with KMeans: {agree}/{len(cases)}")
+
+    start = time.perf_counter()
+    for c in cases:
+        kmeans_upper_mask(KMeans, c)
+    kmeans_ms = (time.perf_counter() - start) / len(cases) * 1000
+
+    start = time.perf_counter()
+    for c in cases:
+        split_jaws(c)
+    split_ms = (time.perf_counter() - start) / len(cases) * 1000
+
+    print(f"KMeans:     {kmeans_ms:.3f} ms per split")
+    print(f"split_jaws: {split_ms:.3f} ms per split")
+    print(f"degenerate inputs: {split_jaws([])}, {split_jaws([420.0])}, {split_jaws([5.0, 5.0])}")
@@ -0,0 +1,83 @@
+"""
+Measures CRUD latency against a local PostgREST stand-in with a new client per
+request (the old get_supabase_client) versus the pooled client.
+
+Run from app/backend:
+    python scripts/bench_supabase_client.py --requests 200
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from supabase import create_client
+from config import Config
+from services import supabase_client
+from services.supabase_client import get_supabase_client
+
+ROWS = [{"id": i, "fullname": f"Patient {i}", "user_id": "1"} for i in range(20)]
+
+
+class PostgrestStandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real PostgREST
+    wbufsize = -1  # send headers and body in one write, avoiding Nagle/delayed-ACK stalls
+    connections = set()
+
+    def do_GET(self):
+        PostgrestStandIn.connections.add(self.client_address)
+        body = json.dumps(ROWS).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def fake_key():
+    # create_client only checks that the key looks like a JWT
+    part = lambda obj: base64.urlsafe_b64encode(json.dumps(obj).encode()).decode().rstrip("=")
+    return f"{part({'alg': 'HS256'})}.{part({'role': 'anon'})}.signature"
+
+
+def run(app, requests, pooled):
+    url, key = app.config["SUPABASE_URL"], app.config["SUPABASE_KEY"]
+    PostgrestStandIn.connections = set()
+    start = time.perf_counter()
+    for _ in range(requests):
+        with app.app_context():
+            supabase = get_supabase_client() if pooled else create_client(url, key)
+            response = supabase.table("Patients").select("*").eq("user_id", "1").execute()
+            assert len(response.data) == len(ROWS)
+    elapsed = time.perf_counter() - start
+    return elapsed / requests * 1000, len(PostgrestStandIn.connections)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PostgrestStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config["SUPABASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    app.config["SUPABASE_KEY"] = fake_key()
+    supabase_client.init_app(app)
+
+    for pooled in (False, True):
+        ms, connections = run(app, args.requests, pooled)
+        label = "pooled client" if pooled else "client per request"
+        print(f"{label:<20} {ms:.2f} ms/request, {connections} TCP connections for {args.requests} requests")
+    server.shutdown()
@@ -0,0 +1,77 @@
+"""
+Compares whole-image and tiled inference on large radiographs: latency per
+image, number of anomalies found, and how many of the reference detections
+(the first configuration) each configuration recovers.
+
+Run from app/backend:
+    python scripts/bench_tiling.py path/to/panoramic.jpg [more.jpg ...] --configs 640 1280 tile:1024:128 tile:1280:160
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.model_registry import model_registry
+from services.inference_engine import InferenceEngine
+from services.tooth_assignment import as_boxes, iou_matrix
+
+
+def make_engine(config, max_batch):
+    # "640" -> whole image at imgsz 640; "tile:1024:128" -> 1024 px tiles, 128 px overlap, native imgsz
+    if config.startswith("tile:"):
+        _, tile_size, overlap = config.split(":")
+        return InferenceEngine(model_registry, max_batch=max_batch, imgsz=int(tile_size),
+                               tile_size=int(tile_size), tile_overlap=int(overlap), tiled_models=["anomalies"])
+    return InferenceEngine(model_registry, max_batch=max_batch, imgsz=int(config))
+
+
+def classes_of(result):
+    classes = result.boxes.cls
+    return np.asarray(classes.cpu() if hasattr(classes, 'cpu') else classes)
+
+
+def recall(reference, detections, threshold=0.5):
+    """Fraction of reference (boxes, classes) matched by a same-class detection with IoU above threshold."""
+    ref_boxes, ref_classes = reference
+    boxes, classes = detections
+    if len(ref_boxes) == 0:
+        return 1.0
+    if len(boxes) == 0:
+        return 0.0
+    matches = (iou_matrix(ref_boxes, boxes) > threshold) & (ref_classes[:, None] == classes[None, :])
+    return matches.any(axis=1).mean()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--configs", nargs="+", default=["1280", "640", "tile:1024:128", "tile:640:96"])
+    parser.add_argument("--max-batch", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    images = [cv2.imread(path, cv2.IMREAD_COLOR) for path in args.images]
+    model_registry.load_all()
+
+    reference = None
+    print(f"{'config':<18}{'ms/image':>10}{'anomalies':>11}{'recall vs ' + args.configs[0]:>20}")
+    for config in args.configs:
+        engine = make_engine(config, args.max_batch)
+        engine._run_model('anomalies', images[:1])  # warm up this input size
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            results = engine._run_model('anomalies', images)
+        elapsed = (time.perf_counter() - start) / (args.repeat * len(images))
+
+        detections = [(as_boxes(result.boxes.xyxy), classes_of(result)) for result in results]
+        if reference is None:
+            reference = detections
+        found = sum(len(boxes) for boxes, _ in detections)
+        agreement = np.mean([recall(ref, det) for ref, det in zip(reference, detections)])
+        print(f"{config:<18}{elapsed * 1000:>10.0f}{found:>11}{agreement:>20.2f}")
@@ -0,0 +1,107 @@
+"""
+Parity check and micro-benchmark for services/tooth_assignment.py against the
+nested-loop assignment that used to live in upload_image.
+
+Run from app/backend:
+    python scripts/bench_tooth_assignment.py --anomalies 5 20 80 --repeat 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.tooth_assignment import assign_anomalies
+
+NAMES = ['Implant', 'Periapical Radiolucency', 'Obturation', 'Endodontic Treatment', 'Caries', 'Bone Loss']
+
+
+def legacy_assign(sorted_teeth, anomaly_boxes, anomaly_names):
+    report_data = {i: [] for i in range(1, 33)}
+    tooth_number_map = {i + 1: sorted_teeth[i] for i in range(len(sorted_teeth))}
+
+    for bbox, full_name in zip(anomaly_boxes, anomaly_names):
+        x1, y1, x2, y2 = map(int, bbox)
+        anomaly_box = (x1, y1, x2, y2)
+
+        def compute_iou(boxA, boxB):
+            ax1, ay1, ax2, ay2 = boxA
+            bx1, by1, bx2, by2 = boxB
+            ix1 = max(ax1, bx1)
+            iy1 = max(ay1, by1)
+            ix2 = min(ax2, bx2)
+            iy2 = min(ay2, by2)
+            iw = max(0, ix2 - ix1)
+            ih = max(0, iy2 - iy1)
+            intersection = iw * ih
+            areaA = (ax2 - ax1) * (ay2 - ay1)
+            areaB = (bx2 - bx1) * (by2 - by1)
+            union = areaA + areaB - intersection
+            return intersection / union if union != 0 else 0
+
+        assigned = False
+        for tooth_id, tooth_box in tooth_number_map.items():
+            iou = compute_iou(anomaly_box, tooth_box)
+            if iou > 0.05:
+                if full_name not in report_data[tooth_id]:
+                    report_data[tooth_id].append(full_name)
+                assigned = True
+
+        if not assigned:
+            for tooth_id, (tx1, ty1, tx2, ty2) in tooth_number_map.items():
+                if not (x2 < tx1 or x1 > tx2 or y2 < ty1 or y1 > ty2):
+                    if full_name not in report_data[tooth_id]:
+                        report_data[tooth_id].append(full_name)
+    return report_data
+
+
+def random_case(rng, num_teeth, num_anomalies):
+    # Two rows of teeth across a 2000x1000 panoramic, anomalies scattered over them
+    teeth = []
+    for i in range(num_teeth):
+        x1 = 100 + (i % 16) * 110 + rng.integers(-10, 10)
+        y1 = 150 if i < 16 else 520
+        y1 += rng.integers(-20, 20)
+        teeth.append((int(x1), int(y1), int(x1 + 100), int(y1 + 300)))
+
+    xy = rng.uniform(0, 1900, size=(num_anomalies, 2)) * [1, 0.5]
+    wh = rng.uniform(5, 250, size=(num_anomalies, 2))
+    anomalies = np.hstack([xy, xy + wh]).astype(np.float32)
+    names = [NAMES[i] for i in rng.integers(0, len(NAMES), num_anomalies)]
+    return teeth, anomalies, names
+
+
+def check_parity(rng, cases):
+    for _ in range(cases):
+        teeth, anomalies, names = random_case(rng, int(rng.integers(0, 33)), int(rng.integers(0, 60)))
+        expected = legacy_assign(teeth, anomalies, names)
+        actual = assign_anomalies(teeth, anomalies, names)
+        assert actual == expected, f"parity mismatch:\n{expected}\n{actual}"
+    print(f"parity: {cases} random cases identical")
+
+
+def bench(fn, repeat, *args):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--anomalies", type=int, nargs="+", default=[5, 20, 80])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--cases", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    check_parity(rng, args.cases)
+
+    for n in args.anomalies:
+        teeth, anomalies, names = random_case(rng, 32, n)
+        legacy = bench(legacy_assign, args.repeat, teeth, anomalies, names)
+        vectorized = bench(assign_anomalies, args.repeat, teeth, anomalies, names)
+        print(f"{n:4d} anomalies x 32 teeth: loop {legacy:.3f} ms, vectorized {vectorized:.3f} ms")
@@ -0,0 +1,110 @@
+"""
+Compares the image I/O of /upload before and after the lean decode/encode path:
+latency per image and peak RSS, each variant measured in a fresh process.
+
+Inference is replaced by a fixed set of boxes so only decoding, drawing and
+encoding are measured (scripts/bench_inference.py covers the detectors).
+
+Run from app/backend:
+    python scripts/bench_upload_io.py path/to/radiograph.jpg --iterations 20
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+VARIANTS = [
+    # name, output format, quality, max decode reduction
+    ("legacy", None, None, None),
+    ("jpeg q85", "jpeg", 85, 1),
+    ("jpeg q85, reduced decode", "jpeg", 85, 4),
+    ("webp q80", "webp", 80, 1),
+    ("png", "png", None, 1),
+    ("json", "json", None, 1),
+    ("json, reduced decode", "json", None, 4),
+]
+
+
+def fake_analysis(decoded_image):
+    h, w = decoded_image.shape[:2]
+    anomalies = [
+        {"box": [w * i // 10, h // 3, w * i // 10 + w // 12, h // 2], "class_id": i % 5, "label": "Caries", "score": 0.9}
+        for i in range(8)
+    ]
+    return {"teeth": [], "anomalies": anomalies, "report": {}}
+
+
+def legacy_upload(image_bytes):
+    # What /upload did before: copy, full-resolution decode, copy again, default JPEG
+    import cv2
+    import numpy as np
+    from services.analysis import draw_annotations
+
+    image = np.frombuffer(image_bytes, np.uint8)
+    decoded_image = cv2.imdecode(image, cv2.IMREAD_COLOR)
+    analysis = fake_analysis(decoded_image)
+    annotated_image = draw_annotations(decoded_image.copy(), analysis["anomalies"])
+    _, img_encoded = cv2.imencode('.jpg', annotated_image)
+    analysis["image"] = img_encoded.tobytes()
+    return analysis
+
+
+def run_variant(path, variant, iterations, results):
+    from io import BytesIO
+    from services import analysis as analysis_module
+
+    name, output_format, quality, reduction = variant
+    analysis_module.analyze_image = fake_analysis
+
+    # Warm up imports and codecs on a tiny image, so the baseline excludes them but not the radiograph
+    import cv2
+    import numpy as np
+    warmup = cv2.imencode(".jpg", np.zeros((64, 64, 3), np.uint8))[1].tobytes()
+    if output_format is None:
+        legacy_upload(warmup)
+    else:
+        analysis_module.analyze_upload(warmup, output_format if output_format != "json" else "jpeg")
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    timings = []
+    size = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        if output_format is None:
+            with open(path, "rb") as f:
+                result = legacy_upload(f.read())
+        else:
+            # The upload lands in an in-memory buffer, as with app.UploadRequest
+            with open(path, "rb") as f:
+                stream = BytesIO(f.read())
+            start = time.perf_counter()
+            with stream.getbuffer() as image_buffer:
+                result = analysis_module.analyze_upload(image_buffer, output_format, quality, reduction)
+        timings.append(time.perf_counter() - start)
+        size = len(result.get("image", b""))
+        del result
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings.sort()
+    results.put((name, timings[len(timings) // 2] * 1000, (peak - baseline) / 1024, size / 1024))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("image")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    print(f"{'variant':<28}{'p50 ms':>10}{'peak RSS +MB':>15}{'output KB':>12}")
+    for variant in VARIANTS:
+        process = context.Process(target=run_variant, args=(args.image, variant, args.iterations, results))
+        process.start()
+        name, p50, rss, size = results.get()
+        process.join()
+        print(f"{name:<28}{p50:>10.1f}{rss:>15.1f}{size:>12.1f}")
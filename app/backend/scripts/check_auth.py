@@ -0,0 +1,135 @@
+"""
+Checks token verification and the identity cache (services/auth.py) through
+the Flask test client, against a local PostgREST stand-in that records every
+round trip:
+
+- /get_user and GET /patients/<id> hit the database once, then the cache
+- PUT /users/<id> drops the cached row, so the next read sees the update
+- with AUTH_REQUIRED off, junk and expired tokens are treated as anonymous
+- with AUTH_REQUIRED on, anonymous, junk and expired tokens get a 401, while
+  valid tokens, public endpoints and CORS preflights go through
+
+Run from app/backend:
+    python scripts/check_auth.py
+"""
+import datetime
+import json
+import os
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("STARTUP_MODE", "lazy")
+
+import jwt
+from bench_supabase_client import fake_key
+
+SECRET = "check-auth-secret-of-at-least-32-bytes"
+
+
+class PostgrestStandIn(BaseHTTPRequestHandler):
+    """`eq` filters, select and PATCH on in-memory Users and Patients tables."""
+
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+    tables = {
+        "Users": [{"id": 7, "user_id": "uuid-7", "fullname": "Dr A", "role": "doctor", "email": "a@example.com"}],
+        "Patients": [{"id": 3, "user_id": 7, "fullname": "P", "email": "p@example.com"}],
+    }
+    round_trips = []
+
+    def _reply(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _rows(self):
+        url = urllib.parse.urlparse(self.path)
+        table = url.path.rsplit("/", 1)[-1]
+        filters = {k: v[0].split(".", 1)[1] for k, v in urllib.parse.parse_qs(url.query).items()
+                   if k not in ("select", "limit")}
+        PostgrestStandIn.round_trips.append((self.command, table))
+        return [row for row in self.tables[table] if all(str(row.get(k)) == v for k, v in filters.items())]
+
+    def do_GET(self):
+        self._reply(self._rows())
+
+    def do_PATCH(self):
+        rows = self._rows()
+        changes = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        for row in rows:
+            row.update(changes)
+        self._reply(rows)
+
+    def log_message(self, *args):
+        pass
+
+
+def check(condition, message):
+    if not condition:
+        raise SystemExit(f"FAILED: {message}")
+    print(f"ok: {message}")
+
+
+def reads(table):
+    return PostgrestStandIn.round_trips.count(("GET", table))
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PostgrestStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ["JWT_SECRET_KEY"] = SECRET
+    import app as app_module
+    app = app_module.app
+    app.config["SUPABASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    app.config["SUPABASE_KEY"] = fake_key()
+    app.config["JWT_SECRET_KEY"] = SECRET
+    app.config["AUTH_REQUIRED"] = False
+    client = app.test_client()
+
+    with app.test_request_context():
+        from services.auth import identity_cache, issue_token
+        token = issue_token("uuid-7", 7, "Dr A", "doctor")
+    valid = {"Authorization": f"Bearer {token}"}
+    junk = {"Authorization": "Bearer junk"}
+    expired_token = jwt.encode(
+        {"user_id": "uuid-7", "exp": datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=5)},
+        SECRET, algorithm="HS256",
+    )
+    expired = {"Authorization": f"Bearer {expired_token}"}
+
+    # Identity cache
+    response = client.post("/get_user", json={}, headers=valid)
+    check(response.status_code == 200 and response.json["user"]["id"] == 7, "/get_user defaults to the caller")
+    client.post("/get_user", json={"user_id": 7})
+    check(reads("Users") == 1, "a second /get_user is served from the cache")
+    client.put("/users/7", json={"fullname": "Dr B"})
+    response = client.post("/get_user", json={"user_id": 7})
+    check(response.json["user"]["fullname"] == "Dr B" and reads("Users") == 2, "an update drops the cached user")
+    client.get("/patients/3")
+    client.get("/patients/3")
+    check(reads("Patients") == 1, "GET /patients/<id> is served from the cache")
+
+    # AUTH_REQUIRED off: bad tokens are anonymous
+    check(client.get("/patients/3", headers=junk).status_code == 200, "a junk token is anonymous without AUTH_REQUIRED")
+    check(client.get("/patients/3", headers=expired).status_code == 200, "an expired token is anonymous without AUTH_REQUIRED")
+
+    # AUTH_REQUIRED on
+    app.config["AUTH_REQUIRED"] = True
+    check(client.get("/patients/3").status_code == 401, "anonymous requests get a 401")
+    response = client.get("/patients/3", headers=junk)
+    check(response.status_code == 401 and response.json["error"] == "Invalid token", "a junk token gets a 401")
+    response = client.get("/patients/3", headers=expired)
+    check(response.status_code == 401 and response.json["error"] == "Token expired", "an expired token gets a 401")
+    check(client.get("/patients/3", headers=valid).status_code == 200, "a valid token goes through")
+    check(client.post("/signin", json={}, headers=junk).status_code != 401, "sign-in is public, even with a stale token")
+    check(client.get("/ready").status_code != 401, "/ready is public")
+    check(client.options("/patients/3").status_code != 401, "CORS preflights need no token")
+
+    print(identity_cache.stats())
@@ -0,0 +1,213 @@
+"""
+Checks the normalized findings (services/findings.py) and their endpoints
+against a local PostgREST stand-in:
+
+- saving radiographs is one round trip per call, batch or not
+- first/last seen and radiograph counts survive out-of-order dates
+- deleting a radiograph recomputes only its teeth's summaries
+- ?since, the tooth history and the /chat summary lines return the expected rows
+
+The stand-in emulates the `record_findings` and `rebuild_finding_summaries`
+SQL functions from the README in Python, so this checks what the service
+sends and how it reads the results back, not the SQL itself.
+
+Run from app/backend:
+    python scripts/check_findings.py
+"""
+import json
+import os
+import sys
+import threading
+import urllib.parse
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("STARTUP_MODE", "lazy")
+
+from supabase import create_client
+from bench_supabase_client import fake_key
+
+DATE_COLUMNS = ("date", "first_seen", "last_seen")
+
+
+def _when(value):
+    when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return when if when.tzinfo else when.replace(tzinfo=timezone.utc)
+
+
+def _value(column, value):
+    if column in DATE_COLUMNS:
+        return _when(value)
+    return str(value)
+
+
+class PostgrestStandIn(BaseHTTPRequestHandler):
+    """Findings and FindingSummaries in memory: eq/gt/in filters, order, select, delete and the two RPCs."""
+
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+    lock = threading.Lock()
+    tables = {"Findings": [], "FindingSummaries": []}
+    round_trips = 0
+
+    def _reply(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or "null")
+
+    def _query(self):
+        url = urllib.parse.urlparse(self.path)
+        return url.path.split("/rest/v1/", 1)[1], urllib.parse.parse_qsl(url.query)
+
+    @staticmethod
+    def _matches(row, column, condition):
+        op, operand = condition.split(".", 1)
+        if op == "in":
+            return str(row[column]) in [item.strip('"') for item in operand[1:-1].split(",")]
+        left, right = _value(column, row[column]), _value(column, operand.strip('"'))
+        if column == "tooth":
+            left, right = int(left), int(right)
+        return {"eq": left == right, "gt": left > right, "lt": left < right}[op]
+
+    def _select(self, table, params):
+        filters = [(k, v) for k, v in params if k not in ("select", "order", "limit")]
+        return [row for row in self.tables[table] if all(self._matches(row, k, v) for k, v in filters)]
+
+    @classmethod
+    def _fold(cls, findings):
+        # record_findings: insert ... on conflict do update with least/greatest/+
+        summaries = cls.tables["FindingSummaries"]
+        for finding in findings:
+            key = (str(finding["patient_id"]), finding["tooth"], finding["anomaly"])
+            summary = next((s for s in summaries if (str(s["patient_id"]), s["tooth"], s["anomaly"]) == key), None)
+            if summary is None:
+                summaries.append({"patient_id": finding["patient_id"], "tooth": finding["tooth"],
+                                  "anomaly": finding["anomaly"], "first_seen": finding["date"],
+                                  "last_seen": finding["date"], "radiographs": 1})
+                continue
+            summary["radiographs"] += 1
+            summary["first_seen"] = min(summary["first_seen"], finding["date"], key=_when)
+            summary["last_seen"] = max(summary["last_seen"], finding["date"], key=_when)
+
+    def do_POST(self):
+        table, params = self._query()
+        body = self._body()
+        with self.lock:
+            PostgrestStandIn.round_trips += 1
+            if table == "rpc/record_findings":
+                self.tables["Findings"].extend(dict(row) for row in body["findings"])
+                self._fold(body["findings"])
+                return self._reply(None)
+            if table == "rpc/rebuild_finding_summaries":
+                patient_id, teeth = str(body["p_patient_id"]), body["p_teeth"]
+                selected = lambda row: str(row["patient_id"]) == patient_id and (teeth is None or row["tooth"] in teeth)
+                self.tables["FindingSummaries"] = [s for s in self.tables["FindingSummaries"] if not selected(s)]
+                self._fold([row for row in self.tables["Findings"] if selected(row)])
+                return self._reply(None)
+        self._reply({"message": "not found"}, 404)
+
+    def do_GET(self):
+        table, params = self._query()
+        with self.lock:
+            PostgrestStandIn.round_trips += 1
+            rows = [dict(row) for row in self._select(table, params)]
+        orders = [part.split(".") for k, v in params if k == "order" for part in v.split(",")]
+        for column, *direction in reversed(orders):
+            rows.sort(key=lambda row: _value(column, row[column]) if column in DATE_COLUMNS else row[column],
+                      reverse=direction[:1] == ["desc"])
+        columns = dict(params).get("select", "*")
+        if columns != "*":
+            rows = [{c: row[c] for c in columns.split(",")} for row in rows]
+        self._reply(rows)
+
+    def do_DELETE(self):
+        table, params = self._query()
+        self._body()
+        with self.lock:
+            PostgrestStandIn.round_trips += 1
+            deleted = self._select(table, params)
+            self.tables[table] = [row for row in self.tables[table] if row not in deleted]
+        self._reply(deleted)
+
+    def log_message(self, *args):
+        pass
+
+
+def check(condition, message):
+    if not condition:
+        raise SystemExit(f"FAILED: {message}")
+    print(f"ok: {message}")
+
+
+def radiograph(radiograph_id, patient_id, date, report):
+    return {"id": radiograph_id, "patient_id": patient_id, "date": date, "report": json.dumps(report)}
+
+
+def summaries(patient_id):
+    return {(s["tooth"], s["anomaly"]): s for s in PostgrestStandIn.tables["FindingSummaries"]
+            if str(s["patient_id"]) == str(patient_id)}
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PostgrestStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    from services.findings import (forget_findings, new_findings, normalize_report, patient_summary,
+                                   record_findings, summary_report, summary_text, tooth_history)
+    supabase = create_client(url, fake_key())
+
+    first = radiograph(1, 5, "2023-01-05T00:00:00Z", {"12": ["Caries"], "3": [], "14": ["Caries", "Bone Loss"]})
+    second = radiograph(2, 5, "2024-03-02T00:00:00Z", {"12": ["Caries", "Implant"], "20": ["Caries"]})
+    older = radiograph(3, 5, "2022-06-01T00:00:00Z", {"12": ["Caries"]})  # saved last, dated first
+    other = radiograph(4, 9, "2024-01-01T00:00:00Z", {"1": ["Caries"]})
+
+    check(normalize_report({"x": ["A"], "2": "bad", "4": ["A", "A"]}) == [(4, "A")], "reports are normalized")
+
+    record_findings(supabase, [first])
+    check(PostgrestStandIn.round_trips == 1, "saving a radiograph is one round trip")
+    record_findings(supabase, [second, older, other])
+    check(PostgrestStandIn.round_trips == 2, "saving a batch is one round trip")
+
+    caries = summaries(5)[(12, "Caries")]
+    check((caries["first_seen"][:10], caries["last_seen"][:10], caries["radiographs"]) == ("2022-06-01", "2024-03-02", 3),
+          "first/last seen and counts survive out-of-order dates")
+    check(set(summaries(9)) == {(1, "Caries")}, "patients are kept apart")
+
+    lines = summary_text(patient_summary(supabase, 5))
+    check("Tooth 12: Caries (2022-06-01 to 2024-03-02, 3 radiographs), Implant (2024-03-02, 1 radiograph)" in lines,
+          "the /chat summary has one line per tooth")
+    check(summary_report(patient_summary(supabase, 5)) == {"12": ["Caries", "Implant"], "14": ["Caries", "Bone Loss"], "20": ["Caries"]},
+          "the summary reads back as a report")
+    check({(f["tooth"], f["anomaly"]) for f in new_findings(supabase, 5, "2023-06-01T00:00:00Z")} == {(12, "Implant"), (20, "Caries")},
+          "?since returns only findings first seen after the date")
+    check([entry["radiograph_id"] for entry in tooth_history(supabase, 5, 12)] == [3, 1, 2], "tooth history is oldest first")
+
+    forget_findings(supabase, older)
+    caries = summaries(5)[(12, "Caries")]
+    check((caries["first_seen"][:10], caries["radiographs"]) == ("2023-01-05", 2), "deleting a radiograph recomputes its teeth")
+    forget_findings(supabase, second)
+    check(set(summaries(5)) == {(12, "Caries"), (14, "Caries"), (14, "Bone Loss")}, "findings of deleted radiographs disappear")
+
+    # The endpoints, through the pooled client of the app
+    import app as app_module
+    app = app_module.app
+    app.config["SUPABASE_URL"] = url
+    app.config["SUPABASE_KEY"] = fake_key()
+    client = app.test_client()
+    response = client.get("/patients/5/findings")
+    check(response.status_code == 200 and len(response.json["findings"]) == 3, "GET /patients/<id>/findings")
+    check(client.get("/patients/5/findings", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304,
+          "an unchanged summary is a 304")
+    check(client.get("/patients/5/findings?since=junk").status_code == 400, "a bad ?since is a 400")
+    response = client.get("/patients/5/teeth/14/history")
+    check(response.status_code == 200 and response.json["history"][0]["anomalies"] == ["Caries", "Bone Loss"],
+          "GET /patients/<id>/teeth/<n>/history")
+    check(client.get("/patients/5/teeth/40/history").status_code == 400, "an unknown tooth is a 400")
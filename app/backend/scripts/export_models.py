@@ -0,0 +1,104 @@
+"""
+Exports the YOLO detectors for the lean inference backends in services/detectors.py.
+
+ONNX models can be quantized to INT8 with ONNX Runtime: statically, calibrated
+on a folder of radiographs (--calibration), or dynamically without one. The
+INT8 ONNX file also runs on OpenVINO (MODEL_RUNTIME=openvino).
+
+Run from app/backend:
+    python scripts/export_models.py --format onnx --int8 --calibration fixtures/radiographs
+    python scripts/export_models.py models/teeth.pt --format openvino torchscript
+
+Then point ANOMALIES_MODEL_PATH / TEETH_MODEL_PATH at the exported files and
+check them with scripts/bench_backends.py.
+"""
+import argparse
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.detectors import letterbox
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+
+
+def calibration_images(directory):
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory) if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def quantize_onnx(onnx_path, imgsz, calibration_dir=None):
+    """Write an INT8 copy of an ONNX model next to it and return its path."""
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic, quantize_static,
+    )
+
+    int8_path = onnx_path.replace(".onnx", ".int8.onnx")
+    if not calibration_dir:
+        quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+        return int8_path
+
+    class RadiographReader(CalibrationDataReader):
+        # Feeds calibration images preprocessed exactly like ExportedDetector does
+        def __init__(self, paths, input_name):
+            self.paths = iter(paths)
+            self.input_name = input_name
+
+        def get_next(self):
+            path = next(self.paths, None)
+            if path is None:
+                return None
+            padded, _, _ = letterbox(cv2.imread(path, cv2.IMREAD_COLOR), imgsz)
+            batch = np.ascontiguousarray(padded[None, :, :, ::-1].transpose(0, 3, 1, 2), dtype=np.float32) / 255.0
+            return {self.input_name: batch}
+
+    import onnxruntime
+    input_name = onnxruntime.InferenceSession(onnx_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    quantize_static(
+        onnx_path,
+        int8_path,
+        RadiographReader(calibration_images(calibration_dir), input_name),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+    return int8_path
+
+
+def export(weights, formats, imgsz, dynamic, int8, calibration_dir):
+    from ultralytics import YOLO
+
+    exported = []
+    for export_format in formats:
+        model = YOLO(weights)
+        if export_format == "onnx":
+            # A dynamic batch lets the inference engine run micro-batches in one call
+            path = model.export(format="onnx", imgsz=imgsz, dynamic=dynamic, simplify=True)
+            exported.append(path)
+            if int8:
+                exported.append(quantize_onnx(path, imgsz, calibration_dir))
+        else:
+            exported.append(model.export(format=export_format, imgsz=imgsz))
+    return exported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("weights", nargs="*", default=[Config.ANOMALIES_MODEL_PATH, Config.TEETH_MODEL_PATH])
+    parser.add_argument("--format", nargs="+", default=["onnx"], choices=["onnx", "openvino", "torchscript"])
+    parser.add_argument("--imgsz", type=int, default=Config.INFERENCE_IMGSZ or 640)
+    parser.add_argument("--static-batch", action="store_true", help="export ONNX with a fixed batch size of 1")
+    parser.add_argument("--int8", action="store_true", help="also write an INT8-quantized ONNX model")
+    parser.add_argument("--calibration", help="folder of radiographs for static INT8 calibration")
+    args = parser.parse_args()
+
+    for weights in args.weights:
+        for path in export(weights, args.format, args.imgsz, not args.static_batch, args.int8, args.calibration):
+            print(f"{weights} -> {path}")
@@ -0,0 +1,290 @@
+"""
+Parallel, incremental and resumable knowledge base ingestion.
+
+Streams the pages of each PDF through a pool of OCR processes, splits every
+page into chunks, embeds new chunks in batches and upserts them to Qdrant in
+bounded batches under deterministic content-hash IDs. A JSON manifest records
+what was ingested, so a re-run (or a resumed, interrupted run) skips pages
+whose rendering did not change and chunks that are already stored, and
+deletes chunks whose text (or page) disappeared once the batch replacing
+them is stored.
+
+Plain .txt inputs written by scripts/script.py ("--- Page N ---" markers) are
+accepted as well and skip the OCR step.
+
+Run from app/backend, against a local Qdrant:
+    python scripts/ingest_pipeline.py kb/srd.pdf --qdrant-url http://localhost:6333 --workers 4
+or an embedded on-disk store:
+    python scripts/ingest_pipeline.py kb/srd.pdf --embedded data/qdrant
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from services.knowledge_base import COLLECTION_NAME, EMBEDDING_MODEL
+
+# Namespace for chunk IDs: the same text always maps to the same Qdrant point
+CHUNK_NAMESPACE = uuid.UUID("6f1c1d0e-4b8e-4a51-9a37-0c2f3e5b7d21")
+
+
+def clean_text(text):
+    text = re.sub(r'[^\x00-\x7F]+', ' ', text)  # remove non-ASCII
+    text = re.sub(r'\s+', ' ', text)  # collapse whitespace
+    return text.strip()
+
+
+def ocr_page(pdf_path, page_number, dpi, known_hash):
+    """Render one page, and OCR it only if its rendering changed since the last run."""
+    from pdf2image import convert_from_path
+    from pytesseract import image_to_string
+
+    image = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)[0]
+    image_hash = hashlib.sha256(image.tobytes()).hexdigest()
+    if image_hash == known_hash:
+        return page_number, image_hash, None
+    return page_number, image_hash, clean_text(image_to_string(image))
+
+
+def pdf_pages(pdf_path, manifest_pages, workers, dpi):
+    """Yield (page_number, image_hash, text or None if unchanged) in page order."""
+    from pdf2image import pdfinfo_from_path
+
+    page_count = pdfinfo_from_path(pdf_path)["Pages"]
+    # spawn keeps torch (loaded later for embeddings) out of the OCR workers
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        # A few pages ahead per worker: enough to keep them busy without holding
+        # every page's text while embedding falls behind
+        futures = deque()
+        for n in range(1, page_count + 1):
+            futures.append(pool.submit(ocr_page, pdf_path, n, dpi, manifest_pages.get(str(n), {}).get("hash")))
+            if len(futures) >= workers * 2:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+
+def text_pages(txt_path, manifest_pages):
+    with open(txt_path, encoding="utf-8") as f:
+        content = f.read()
+    parts = re.split(r"--- Page (\d+) ---", content)
+    if len(parts) == 1:
+        parts = ["", "1", content]
+    for page, text in zip(parts[1::2], parts[2::2]):
+        text = text.strip()
+        text_hash = hashlib.sha256(text.encode()).hexdigest()
+        unchanged = manifest_pages.get(page, {}).get("hash") == text_hash
+        yield int(page), text_hash, None if unchanged else text
+
+
+class Manifest:
+    """What has been ingested so far, saved atomically after every upserted batch."""
+
+    def __init__(self, path):
+        self.path = path
+        self.data = {"sources": {}}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.data = json.load(f)
+
+    def source(self, name):
+        return self.data["sources"].setdefault(name, {"pages": {}})
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+
+
+def chunk_id(text):
+    return str(uuid.uuid5(CHUNK_NAMESPACE, hashlib.sha256(text.encode()).hexdigest()))
+
+
+class Ingestor:
+    def __init__(self, client, collection_name, embeddings, manifest, embed_batch=64, upsert_batch=128):
+        self.client = client
+        self.collection_name = collection_name
+        self.embeddings = embeddings
+        self.manifest = manifest
+        self.embed_batch = embed_batch
+        self.upsert_batch = upsert_batch
+        self.splitter = RecursiveCharacterTextSplitter(
+            chunk_size=1000,
+            chunk_overlap=200,
+            separators=["\n\n", "\n", ".", " ", ""]
+        )
+        self.id_pages = self._id_pages()
+        self.stored_ids = set(self.id_pages)
+        self.pending = []  # (id, text, metadata) waiting to be embedded
+        self.pending_pages = []  # (source, page, entry or None if removed) recorded once their chunks are stored
+        self.stats = {"pages": 0, "pages_ocr": 0, "pages_skipped": 0, "pages_removed": 0,
+                      "chunks": 0, "chunks_skipped": 0, "chunks_deleted": 0}
+
+    def _id_pages(self):
+        # Chunk ID -> the (source, page) entries of the manifest that produce it
+        id_pages = {}
+        for name, source in self.manifest.data["sources"].items():
+            for page, entry in source["pages"].items():
+                for cid in entry.get("chunks", []):
+                    id_pages.setdefault(cid, set()).add((name, page))
+        return id_pages
+
+    def ensure_collection(self):
+        from qdrant_client.http.models import Distance, VectorParams
+        if not self.client.collection_exists(self.collection_name):
+            size = len(self.embeddings.embed_query("dimension probe"))
+            self.client.create_collection(
+                collection_name=self.collection_name,
+                vectors_config=VectorParams(size=size, distance=Distance.COSINE),
+            )
+
+    def add_page(self, source, page_number, page_hash, text):
+        self.stats["pages"] += 1
+        if text is None:
+            self.stats["pages_skipped"] += 1
+            return
+        self.stats["pages_ocr"] += 1
+
+        ids = []
+        for chunk in self.splitter.split_text(text):
+            cid = chunk_id(chunk)
+            if cid in ids:
+                continue
+            ids.append(cid)
+            if cid in self.stored_ids:
+                self.stats["chunks_skipped"] += 1
+            else:
+                self.pending.append((cid, chunk, {"source": source, "page": page_number}))
+
+        self.pending_pages.append((source, str(page_number), {"hash": page_hash, "chunks": ids}))
+        if len(self.pending) >= self.upsert_batch:
+            self.flush()
+
+    def remove_missing_pages(self, source, page_numbers):
+        """Forget the pages of `source` that were not seen in this run (e.g. dropped from the PDF)."""
+        seen = {str(n) for n in page_numbers}
+        for page in list(self.manifest.source(source)["pages"]):
+            if page not in seen:
+                self.pending_pages.append((source, page, None))
+                self.stats["pages_removed"] += 1
+
+    def flush(self):
+        from qdrant_client.http.models import PointStruct
+        while self.pending:
+            batch, self.pending = self.pending[:self.upsert_batch], self.pending[self.upsert_batch:]
+            vectors = []
+            for i in range(0, len(batch), self.embed_batch):
+                vectors.extend(self.embeddings.embed_documents([text for _, text, _ in batch[i:i + self.embed_batch]]))
+            # Same payload layout as langchain's QdrantVectorStore, so the app can read these points
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=[
+                    PointStruct(id=cid, vector=vector, payload={"page_content": text, "metadata": metadata})
+                    for (cid, text, metadata), vector in zip(batch, vectors)
+                ],
+            )
+            self.stored_ids.update(cid for cid, _, _ in batch)
+            self.stats["chunks"] += len(batch)
+
+        # Only now that the replacement chunks are stored: record the pages and
+        # delete the chunks no page produces anymore
+        candidates = set()
+        for source, page, entry in self.pending_pages:
+            pages = self.manifest.source(source)["pages"]
+            for cid in pages.pop(page, {}).get("chunks", []):
+                self.id_pages[cid].discard((source, page))
+                candidates.add(cid)
+            if entry is not None:
+                pages[page] = entry
+                for cid in entry["chunks"]:
+                    self.id_pages.setdefault(cid, set()).add((source, page))
+        self.pending_pages = []
+        orphans = {cid for cid in candidates if not self.id_pages[cid]}
+        for cid in orphans:
+            del self.id_pages[cid]
+        # Saved before deleting: a crash in between leaves unreferenced points, never missing ones
+        self.manifest.save()
+
+        if orphans:
+            from qdrant_client.http.models import PointIdsList
+            self.client.delete(collection_name=self.collection_name, points_selector=PointIdsList(points=list(orphans)))
+            self.stored_ids -= orphans
+            self.stats["chunks_deleted"] += len(orphans)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="PDF files, or .txt files from scripts/script.py")
+    parser.add_argument("--collection", default=COLLECTION_NAME)
+    parser.add_argument("--qdrant-url", default=os.getenv("QDRANT_URL", "http://localhost:6333"))
+    parser.add_argument("--qdrant-api-key", default=os.getenv("QDRANT_API_KEY"))
+    parser.add_argument("--embedded", help="use an embedded on-disk Qdrant store at this path instead of a server")
+    parser.add_argument("--manifest", default="data/ingest_manifest.json")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="OCR processes")
+    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--embed-batch", type=int, default=64)
+    parser.add_argument("--upsert-batch", type=int, default=128)
+    parser.add_argument("--local-index-dir", default=Config.LOCAL_INDEX_DIR,
+                        help="export the collection here for VECTOR_BACKEND=local ('' to skip)")
+    args = parser.parse_args()
+
+    from langchain_huggingface import HuggingFaceEmbeddings
+    from langchain_qdrant import QdrantVectorStore
+    from qdrant_client import QdrantClient
+    from ingest import publish_version
+
+    if args.embedded:
+        client = QdrantClient(path=args.embedded)
+    else:
+        client = QdrantClient(url=args.qdrant_url, api_key=args.qdrant_api_key)
+    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    manifest = Manifest(args.manifest)
+
+    ingestor = Ingestor(client, args.collection, embeddings, manifest, args.embed_batch, args.upsert_batch)
+    ingestor.ensure_collection()
+
+    start = time.perf_counter()
+    for path in args.inputs:
+        source = os.path.basename(path)
+        known_pages = manifest.source(source)["pages"]
+        if path.lower().endswith(".pdf"):
+            pages = pdf_pages(path, known_pages, args.workers, args.dpi)
+        else:
+            pages = text_pages(path, known_pages)
+        seen = []
+        for page_number, page_hash, text in pages:
+            ingestor.add_page(source, page_number, page_hash, text)
+            seen.append(page_number)
+        ingestor.remove_missing_pages(source, seen)
+    ingestor.flush()
+    elapsed = time.perf_counter() - start
+
+    s = ingestor.stats
+    print(f"{s['pages']} pages ({s['pages_ocr']} processed, {s['pages_skipped']} unchanged, "
+          f"{s['pages_removed']} removed) in {elapsed:.1f}s: "
+          f"{s['pages'] / elapsed:.2f} pages/sec")
+    print(f"{s['chunks']} chunks stored ({s['chunks_skipped']} already present, {s['chunks_deleted']} deleted): "
+          f"{s['chunks'] / elapsed:.2f} chunks/sec")
+
+    if s["chunks"] or s["chunks_deleted"]:
+        vector_store = QdrantVectorStore(client=client, collection_name=args.collection, embedding=embeddings)
+        publish_version(client, args.collection, vector_store, args.local_index_dir or None)
+    else:
+        print("Knowledge base unchanged, version not bumped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Fires concurrent POST /upload requests at a running backend and reports
+throughput and latency, to compare `python app.py` with the gunicorn profile.
+
+Run from app/backend:
+    python scripts/load_test.py path/to/radiograph.jpg --url http://127.0.0.1:5000 --requests 40 --concurrency 8
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+
+def upload(client, url, image_bytes):
+    start = time.perf_counter()
+    response = client.post(f"{url}/upload", files={"file": ("radiograph.jpg", image_bytes, "image/jpeg")})
+    return response.status_code, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("image")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--unique", action="store_true", help="append a counter to each upload so the result cache never hits")
+    args = parser.parse_args()
+
+    with open(args.image, "rb") as f:
+        image_bytes = f.read()
+
+    def payload(i):
+        # Trailing bytes after the JPEG end marker are ignored by the decoder
+        return image_bytes + str(i).encode() if args.unique else image_bytes
+
+    with httpx.Client(timeout=300) as client, ThreadPoolExecutor(args.concurrency) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(lambda i: upload(client, args.url, payload(i)), range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for _, latency in results)
+    errors = sum(1 for status, _ in results if status != 200)
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {errors} errors")
+    print(f"throughput: {args.requests / elapsed:.2f} req/s")
+    print(f"latency p50: {statistics.median(latencies) * 1000:.0f} ms, "
+          f"p95: {latencies[int(0.95 * (len(latencies) - 1))] * 1000:.0f} ms, "
+          f"max: {latencies[-1] * 1000:.0f} ms")
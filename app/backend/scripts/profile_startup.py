@@ -0,0 +1,58 @@
+"""
+Import-time profile of the backend, to catch heavy imports creeping back onto
+the startup path.
+
+Runs `python -X importtime -c "import app"` with STARTUP_MODE=lazy (so nothing
+is prewarmed) and prints the top-level packages that cost the most (self time
+of all their modules) and the total time.
+
+Run from app/backend:
+    python scripts/profile_startup.py --top 15 --max-ms 2000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile(module):
+    env = dict(os.environ, STARTUP_MODE="lazy")
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        sys.exit(proc.stderr.splitlines()[-1] if proc.stderr else f"import {module} failed")
+
+    # Lines look like: "import time:       123 |       4567 |   package.sub".
+    # Summing self time per top-level package attributes every module exactly once.
+    packages = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        top = name.strip().split(".")[0]
+        packages[top] = packages.get(top, 0) + int(self_us)
+    return wall, packages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, default=None, help="exit with an error if importing takes longer")
+    args = parser.parse_args()
+
+    wall, packages = profile(args.module)
+    print(f"import {args.module}: {wall * 1000:.0f} ms wall clock (interpreter start included)")
+    print(f"{'package':<30} {'self ms':>14}")
+    for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{name:<30} {us / 1000:>14.1f}")
+
+    if args.max_ms is not None and wall * 1000 > args.max_ms:
+        sys.exit(f"startup regression: {wall * 1000:.0f} ms > {args.max_ms:.0f} ms")
@@ -0,0 +1,178 @@
+import cv2
+import numpy as np
+from config import Config
+from services.inference_engine import inference_engine
+from services.jaw_partition import number_teeth
+from services.tooth_assignment import assign_anomalies
+from services.anomaly_classes import class_names_anomalies, anomaly_full_names
+
+num_classes_anomalies = len(class_names_anomalies)
+color_map = {i: tuple(np.random.randint(0, 255, 3).tolist()) for i in range(num_classes_anomalies)}
+
+# The detectors letterbox every image to this size (ultralytics' default imgsz unless configured)
+MODEL_INPUT_SIZE = Config.INFERENCE_IMGSZ or 640
+
+# Decoder flags per reduction factor; JPEG decoders downscale while decoding
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# Encodings of the annotated image: format -> (extension, mimetype, quality parameter)
+OUTPUT_FORMATS = {
+    "jpeg": (".jpg", "image/jpeg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", "image/webp", cv2.IMWRITE_WEBP_QUALITY),
+    "png": (".png", "image/png", None),
+}
+
+
+def analyze_image(decoded_image):
+    """
+    Run both detectors on a decoded BGR radiograph and build the per-tooth report.
+
+    Returns:
+        dict: `teeth` (numbered tooth boxes), `anomalies` (boxes with class and
+        score) and `report` (tooth number -> anomaly names).
+    """
+    # Inference (batched with other concurrent uploads)
+    result_anomalies, result_teeth = inference_engine.predict(decoded_image)
+
+    # Step 1: Extract teeth boxes, split them into upper/lower jaw and number them
+    teeth_boxes = [tuple(map(int, bbox)) for bbox in result_teeth.boxes.xyxy]
+    sorted_teeth = number_teeth(teeth_boxes)
+
+    # Step 2: Assign anomaly detections to teeth
+    anomaly_boxes = result_anomalies.boxes.xyxy
+    anomaly_class_ids = [int(cls) for cls in result_anomalies.boxes.cls]
+    anomaly_names = [anomaly_full_names[class_names_anomalies[class_id]] for class_id in anomaly_class_ids]
+    report_data = assign_anomalies(sorted_teeth, anomaly_boxes, anomaly_names)
+
+    anomalies = [
+        {
+            "box": list(map(int, bbox)),
+            "class_id": class_id,
+            "label": class_names_anomalies[class_id],
+            "score": round(float(conf), 4),
+        }
+        for bbox, class_id, conf in zip(anomaly_boxes, anomaly_class_ids, result_anomalies.boxes.conf)
+    ]
+    teeth = [{"number": i + 1, "box": list(box)} for i, box in enumerate(sorted_teeth)]
+    return {"teeth": teeth, "anomalies": anomalies, "report": report_data}
+
+
+def draw_annotations(image, anomalies):
+    """Draw the anomaly boxes and their labels onto `image` in place."""
+    for anomaly in anomalies:
+        x1, y1, x2, y2 = anomaly["box"]
+        label = anomaly["label"]
+        color = color_map[anomaly["class_id"]]
+
+        cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+        (text_width, text_height), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)
+        cv2.rectangle(image, (x1, y1 - text_height - 2), (x1 + text_width, y1), color, -1)
+        cv2.putText(image, label, (x1, y1 - 2), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+    return image
+
+
+def decode_image(buffer, max_reduction=1):
+    """
+    Decode an uploaded radiograph to BGR straight from its buffer.
+
+    The detectors scale every image down to MODEL_INPUT_SIZE anyway, so large
+    radiographs may be decoded at 1/2, 1/4 or 1/8 resolution (at most
+    `max_reduction`) as long as the long side stays at or above that size.
+
+    Returns:
+        tuple: The decoded image and the reduction factor that was applied.
+    """
+    data = np.frombuffer(buffer, np.uint8)
+    reduction = max_reduction
+    while True:
+        decoded_image = cv2.imdecode(data, REDUCED_DECODE_FLAGS[reduction])
+        if decoded_image is None:
+            raise ValueError("Could not decode the uploaded image")
+        long_side = max(decoded_image.shape[:2])
+        if reduction == 1 or long_side >= MODEL_INPUT_SIZE:
+            return decoded_image, reduction
+        # Too small for the detectors at this reduction: decode again with the largest one that fits
+        full_size = long_side * reduction
+        reduction = max((r for r in REDUCED_DECODE_FLAGS if r < reduction and full_size // r >= MODEL_INPUT_SIZE), default=1)
+
+
+def encode_image(image, output_format="jpeg", quality=None):
+    """Encode `image` as "jpeg", "webp" or "png"; `quality` (1-100) applies to the lossy formats."""
+    extension, _, quality_param = OUTPUT_FORMATS[output_format]
+    params = [quality_param, int(quality)] if quality_param is not None and quality is not None else []
+    _, img_encoded = cv2.imencode(extension, image, params)
+    return img_encoded.tobytes()
+
+
+def scale_boxes(analysis, factor):
+    """Scale the boxes of `analysis` in place, e.g. back to full resolution after a reduced decode."""
+    for item in analysis["teeth"] + analysis["anomalies"]:
+        item["box"] = [coord * factor for coord in item["box"]]
+
+
+def analyze_upload(image_buffer, output_format="jpeg", quality=None, max_reduction=1):
+    """
+    Full /upload pipeline: decode, analyze, then draw and encode the annotated image.
+
+    Args:
+        image_buffer (bytes-like): The uploaded file; not copied.
+        output_format (str): "jpeg", "webp", "png", or "json" to skip drawing and encoding.
+        quality (int): Encoder quality for JPEG and WebP, or None for OpenCV's default.
+        max_reduction (int): Largest decode downscale factor allowed (1, 2, 4 or 8).
+
+    Returns:
+        dict: The result of `analyze_image`, with boxes in full-resolution
+        coordinates, the image `width` and `height`, plus the encoded `image`
+        unless `output_format` is "json".
+    """
+    if Config.INFERENCE_TILE_SIZE:
+        # Tiles exist to keep the full resolution, so never decode below it
+        max_reduction = 1
+    decoded_image, reduction = decode_image(image_buffer, max_reduction)
+    analysis = analyze_image(decoded_image)
+
+    if output_format != "json":
+        # Inference is done with the decoded pixels, so annotate them directly
+        draw_annotations(decoded_image, analysis["anomalies"])
+        analysis["image"] = encode_image(decoded_image, output_format, quality)
+
+    if reduction > 1:
+        scale_boxes(analysis, reduction)
+    height, width = decoded_image.shape[:2]
+    analysis["width"], analysis["height"] = width * reduction, height * reduction
+    return analysis
+
+
+def detection_payload(analysis, report_id):
+    """
+    Compact JSON form of an analysis for clients that draw the overlays themselves.
+
+    Anomalies carry only their box, class ID and score; names and the drawing
+    color of each class that occurs are listed once under `classes`.
+    """
+    class_ids = sorted({anomaly["class_id"] for anomaly in analysis["anomalies"]})
+    return {
+        "report_id": report_id,
+        "width": analysis.get("width"),
+        "height": analysis.get("height"),
+        "classes": {
+            class_id: {
+                "label": class_names_anomalies[class_id],
+                "name": anomaly_full_names[class_names_anomalies[class_id]],
+                # color_map is BGR, browsers want RGB
+                "color": "#{2:02x}{1:02x}{0:02x}".format(*color_map[class_id]),
+            }
+            for class_id in class_ids
+        },
+        "teeth": analysis["teeth"],
+        "anomalies": [
+            {"box": anomaly["box"], "class_id": anomaly["class_id"], "score": anomaly["score"]}
+            for anomaly in analysis["anomalies"]
+        ],
+        "report": analysis["report"],
+    }
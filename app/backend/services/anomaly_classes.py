@@ -0,0 +1,18 @@
+# Classes of the anomalies detector, in the order of its output class IDs
+class_names_anomalies = ['IMP', 'PRR', 'OBT', 'END', 'CAR', 'BON', 'IMT', 'API', 'ROT', 'FUR', 'APS', 'ROR', 'ORD', 'SRD']
+anomaly_full_names = {
+    'IMP': 'Implant',
+    'PRR': 'Periapical Radiolucency',
+    'OBT': 'Obturation',
+    'END': 'Endodontic Treatment',
+    'CAR': 'Caries',
+    'BON': 'Bone Loss',
+    'IMT': 'Impacted Tooth',
+    'API': 'Apical Periodontitis',
+    'ROT': 'Root Rotation',
+    'FUR': 'Furcation Involvement',
+    'APS': 'Apical Scar',
+    'ROR': 'Root Overfilling',
+    'ORD': 'Orthodontic Treatment',
+    'SRD': 'Surgical Root Debris'
+}
@@ -0,0 +1,155 @@
+import json
+import os
+import re
+import threading
+from config import Config
+from services.anomaly_classes import anomaly_full_names
+from services.knowledge_base import vector_store, current_collection_version
+
+SNIPPETS_FILE = "anomaly_snippets.json"
+
+# Extra words people use for some classes, on top of the full name and label
+ANOMALY_ALIASES = {
+    'CAR': ['cavity', 'cavities', 'decay'],
+    'IMP': ['implants'],
+    'END': ['root canal'],
+    'OBT': ['filling', 'fillings'],
+    'IMT': ['impacted'],
+    'ORD': ['braces'],
+}
+
+# Questions that refer to the report ("my report", "what was detected", "tooth 12") with no anomaly
+# named are answered from the report's classes; anything else ("how often should I brush my teeth?")
+# goes to retrieval
+REPORT_QUESTION = re.compile(
+    r"\b(report|findings?|detected|radiograph|x-?ray)\b|\b(tooth|teeth)\s*(no\.?|number|#)?\s*\d{1,2}\b|#\d{1,2}\b",
+    re.IGNORECASE,
+)
+
+
+def _class_patterns():
+    patterns = {}
+    for label, name in anomaly_full_names.items():
+        words = [re.escape(name.lower())] + [re.escape(alias) for alias in ANOMALY_ALIASES.get(label, [])]
+        patterns[label] = (re.compile(rf"\b({'|'.join(words)})s?\b", re.IGNORECASE), re.compile(rf"\b{label}\b"))
+    return patterns
+
+
+_patterns = _class_patterns()
+
+
+def build_snippet_index(store, per_class=3):
+    """Run one retrieval per anomaly class and keep the best passages (done at ingest time)."""
+    classes = {}
+    for label, name in anomaly_full_names.items():
+        docs = store.similarity_search(f"{name} in dental radiographs: causes, diagnosis and treatment", k=per_class)
+        classes[label] = {"name": name, "snippets": [doc.page_content for doc in docs]}
+    return classes
+
+
+def save_snippet_index(classes, version, client=None, collection_name=None, local_dir=None):
+    """Store the index in a "<collection>_snippets" Qdrant collection and/or next to the local index."""
+    if client is not None:
+        from qdrant_client.http.models import Distance, PointStruct, VectorParams
+        snippets_collection = f"{collection_name}_snippets"
+        if not client.collection_exists(snippets_collection):
+            client.create_collection(
+                collection_name=snippets_collection,
+                vectors_config=VectorParams(size=1, distance=Distance.DOT),
+            )
+        client.upsert(
+            collection_name=snippets_collection,
+            points=[
+                PointStruct(id=i, vector=[1.0], payload={"label": label, "version": version, **entry})
+                for i, (label, entry) in enumerate(classes.items())
+            ],
+        )
+    if local_dir:
+        os.makedirs(local_dir, exist_ok=True)
+        tmp_path = os.path.join(local_dir, f".{SNIPPETS_FILE}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "classes": classes}, f)
+        os.replace(tmp_path, os.path.join(local_dir, SNIPPETS_FILE))
+
+
+def _load_snippet_index():
+    if Config.VECTOR_BACKEND == "local":
+        try:
+            with open(os.path.join(Config.LOCAL_INDEX_DIR, SNIPPETS_FILE), encoding="utf-8") as f:
+                return json.load(f)["classes"]
+        except OSError:
+            return {}
+
+    from services.knowledge_base import COLLECTION_NAME
+    client = vector_store.get().client
+    if not client.collection_exists(f"{COLLECTION_NAME}_snippets"):
+        return {}
+    points, _ = client.scroll(collection_name=f"{COLLECTION_NAME}_snippets", limit=len(anomaly_full_names) * 2)
+    return {p.payload["label"]: {"name": p.payload["name"], "snippets": p.payload["snippets"]} for p in points}
+
+
+class AnomalySnippets:
+    """Per-class passages precomputed at ingest, reloaded when the knowledge base version changes."""
+
+    def __init__(self):
+        self._classes = None
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fallbacks = 0
+
+    def classes(self, version):
+        if self._classes is None or version != self._version:
+            with self._lock:
+                if self._classes is None or version != self._version:
+                    self._classes = _load_snippet_index()
+                    self._version = version
+        return self._classes
+
+    def context_for(self, question, report, version=None):
+        """
+        Passages for the anomaly classes the question is about, or None when it
+        is an off-report question that needs a regular vector search.
+        """
+        classes = self.classes(version if version is not None else current_collection_version())
+
+        labels = [label for label, (name, abbreviation) in _patterns.items()
+                  if name.search(question) or abbreviation.search(question)]
+        if not labels and REPORT_QUESTION.search(question):
+            labels = report_labels(report)
+
+        snippets = []
+        for label in labels:
+            for snippet in classes.get(label, {}).get("snippets", []):
+                if snippet not in snippets:
+                    snippets.append(snippet)
+
+        if not snippets:
+            self.fallbacks += 1
+            return None
+        self.hits += 1
+        return snippets
+
+    def stats(self):
+        total = self.hits + self.fallbacks
+        return {
+            "snippet_hits": self.hits,
+            "retrieval_fallbacks": self.fallbacks,
+            "snippet_hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def report_labels(report):
+    """Anomaly labels present in a report (tooth number -> anomaly names), in class order."""
+    if isinstance(report, str):
+        try:
+            report = json.loads(report)
+        except ValueError:
+            return []
+    if not isinstance(report, dict):
+        return []
+    found = {name for findings in report.values() if isinstance(findings, list) for name in findings}
+    return [label for label, name in anomaly_full_names.items() if name in found]
+
+
+anomaly_snippets = AnomalySnippets()
@@ -0,0 +1,156 @@
+import datetime
+import threading
+import time
+from collections import OrderedDict
+import jwt
+from flask import current_app, g, jsonify, request
+from config import Config
+
+# Reachable without a token, even with AUTH_REQUIRED (and a stale token never blocks signing in again)
+PUBLIC_ENDPOINTS = {'auth.signin', 'auth.signup', 'auth.logout', 'hello_world', 'ready', 'static'}
+
+
+class Identity:
+    """Who is calling, from the claims of a verified token."""
+
+    __slots__ = ("auth_id", "user_id", "fullname", "role", "patient_id")
+
+    def __init__(self, claims):
+        self.auth_id = claims.get("user_id")  # Supabase auth user (UUID)
+        self.user_id = claims.get("id")  # Users.id; absent in tokens issued before it was added
+        self.fullname = claims.get("fullname")
+        self.role = claims.get("role")
+        self.patient_id = claims.get("patient_id")
+
+
+def issue_token(auth_id, user_id, fullname, role, patient_id=None):
+    """HS256 token for a signed-in user; its claims are everything `Identity` needs."""
+    payload = {
+        "user_id": auth_id,
+        "id": user_id,
+        "fullname": fullname,
+        "role": role,
+        "exp": datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1),  # Token expires in 1 hour
+    }
+    if patient_id:
+        payload["patient_id"] = patient_id
+    return jwt.encode(payload, current_app.config["JWT_SECRET_KEY"], algorithm="HS256")
+
+
+def authenticate():
+    """
+    `before_request` hook: verify the bearer token locally and set `g.identity`.
+
+    Requests without a valid token get `g.identity = None`, and are rejected
+    only when AUTH_REQUIRED is set: until then an expired or invalid token
+    (e.g. left in a browser's storage) is treated like no token, as before
+    tokens were checked on every request.
+    """
+    g.identity = None
+    if request.method == 'OPTIONS' or request.endpoint in PUBLIC_ENDPOINTS:
+        return None
+
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        if current_app.config["AUTH_REQUIRED"]:
+            return jsonify({"error": "Missing token"}), 401
+        return None
+
+    try:
+        claims = jwt.decode(
+            token, current_app.config["JWT_SECRET_KEY"], algorithms=["HS256"], options={"require": ["exp"]}
+        )
+    except jwt.InvalidTokenError as e:
+        if not current_app.config["AUTH_REQUIRED"]:
+            return None
+        error = "Token expired" if isinstance(e, jwt.ExpiredSignatureError) else "Invalid token"
+        return jsonify({"error": error}), 401
+    g.identity = Identity(claims)
+    return None
+
+
+def current_identity():
+    """The `Identity` of the current request, or None for anonymous requests."""
+    return g.get("identity")
+
+
+class IdentityCache:
+    """
+    Short-lived per-worker cache of `Users` and `Patients` rows.
+
+    Keys are `(table, column, value)`, e.g. ("Users", "id", 7). Writes through
+    this worker invalidate their entries; writes elsewhere show up when the
+    TTL runs out. Missing rows are not cached.
+    """
+
+    def __init__(self, ttl_seconds=300, max_entries=5000):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, row):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, row)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, table, row):
+        """Drop every cached lookup of `table` that returned `row` (by any key)."""
+        with self._lock:
+            stale = [
+                key for key, (_, cached) in self._entries.items()
+                if key[0] == table and cached.get("id") == row.get("id")
+            ]
+            stale += [(table, column, str(value)) for column, value in row.items()]
+            for key in stale:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+def cached_row(supabase, table, column, value):
+    """
+    One row of `table` where `column` equals `value`, through the identity cache.
+
+    Returns:
+        dict: The row, or None if there is none.
+    """
+    key = (table, column, str(value))
+    row = identity_cache.get(key)
+    if row is None:
+        rows = supabase.table(table).select('*').eq(column, value).limit(1).execute().data
+        if not rows:
+            return None
+        row = rows[0]
+        identity_cache.put(key, row)
+    return row
+
+
+def init_app(app):
+    app.before_request(authenticate)
+
+
+identity_cache = IdentityCache(ttl_seconds=Config.IDENTITY_CACHE_TTL_SECONDS, max_entries=Config.IDENTITY_CACHE_MAX_ENTRIES)
@@ -0,0 +1,205 @@
+import json
+import mimetypes
+import os
+import re
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from services.derivatives import derivative_files, store_derivatives
+from services.findings import record_findings
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+
+# The only per-file fields a client may set; everything else on an item is the uploader's own
+METADATA_FIELDS = ("patient_id", "date", "report")
+
+CREATED = "created"
+FAILED = "failed"
+
+
+def parse_metadata(text):
+    """
+    Parse the per-file metadata field: a JSON object of filename -> object.
+
+    Returns:
+        dict: filename -> the `METADATA_FIELDS` given for it.
+
+    Raises:
+        ValueError: If it is not valid JSON or not an object of objects.
+    """
+    metadata = json.loads(text or '{}')
+    if not isinstance(metadata, dict) or not all(isinstance(entry, dict) for entry in metadata.values()):
+        raise ValueError("metadata must be a JSON object of filename -> object")
+    return {
+        filename: {field: entry[field] for field in METADATA_FIELDS if field in entry}
+        for filename, entry in metadata.items()
+    }
+
+
+def _read_entry(archive, info, max_size):
+    # The size in the zip header is the sender's claim: stop reading past the limit either way
+    if max_size and info.file_size > max_size:
+        raise ValueError(f"File is larger than {max_size} bytes")
+    with archive.open(info) as entry:
+        data = entry.read(max_size + 1) if max_size else entry.read()
+    if max_size and len(data) > max_size:
+        raise ValueError(f"File is larger than {max_size} bytes")
+    return data
+
+
+def iter_archive(stream, max_size=None):
+    """
+    Yield `(filename, read)` for every image in a zip archive, reading one entry
+    at a time. Entries larger than `max_size` bytes fail on read without being
+    decompressed.
+    """
+    archive = zipfile.ZipFile(stream)
+    for info in archive.infolist():
+        name = os.path.basename(info.filename)
+        if info.is_dir() or name.startswith('.') or not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        yield name, lambda info=info: _read_entry(archive, info, max_size)
+
+
+def iter_files(files):
+    """Yield `(filename, read)` for uploaded multipart files."""
+    for file in files:
+        if file.filename:
+            yield file.filename, file.read
+
+
+class BulkUploader:
+    """
+    Stores many radiographs at once: storage uploads run on a bounded thread
+    pool and the `Radiographs` rows are inserted in batches afterwards.
+
+    Files are read one at a time as the pool frees up, so at most about twice
+    `concurrency` images are held in memory. With `analyze`, images without a
+    report are run through the /upload pipeline first (concurrent images meet
+    in the inference engine's micro-batches) and its per-tooth report is stored.
+    """
+
+    def __init__(self, supabase, concurrency=4, batch_size=100, analyze=False, bucket="radiographs"):
+        self.supabase = supabase
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.analyze = analyze
+        self.bucket = bucket
+
+    def run(self, uploads, defaults, metadata=None):
+        """
+        Args:
+            uploads (iterable): `(filename, read)` pairs from `iter_files` or `iter_archive`.
+            defaults (dict): `patient_id`, `date` and `report` used when a file has no metadata.
+            metadata (dict): Optional per-filename overrides of those fields (see `parse_metadata`).
+
+        Returns:
+            list: One status dict per file, in upload order.
+        """
+        metadata = metadata or {}
+        items = []
+        in_flight = threading.BoundedSemaphore(self.concurrency * 2)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = []
+            for index, (filename, read) in enumerate(uploads):
+                overrides = metadata.get(filename, {})
+                item = {"index": index, "filename": filename, **defaults,
+                        **{field: overrides[field] for field in METADATA_FIELDS if field in overrides}}
+                items.append(item)
+                if not item.get("patient_id"):
+                    item.update(status=FAILED, error="Missing patient_id")
+                    continue
+                if not item.get("report") and not self.analyze:
+                    item.update(status=FAILED, error="Missing report (send one or set analyze=true)")
+                    continue
+
+                in_flight.acquire()
+                try:
+                    data = read()
+                except Exception as e:
+                    in_flight.release()
+                    item.update(status=FAILED, error=str(e))
+                    continue
+                future = pool.submit(self._store, item, data)
+                future.add_done_callback(lambda _: in_flight.release())
+                futures.append(future)
+            for future in futures:
+                future.result()
+
+        self._insert_rows([item for item in items if item.get("status") is None])
+        return [self._status(item) for item in items]
+
+    def _store(self, item, data):
+        try:
+            if not item.get("report"):
+                # Imported here: the analysis pulls in the inference engine
+                from services.analysis import analyze_upload
+                item["report"] = json.dumps(analyze_upload(data, "json")["report"])
+
+            date = item.get("date") or datetime.now(timezone.utc).isoformat()
+            item["date"] = date
+            extension = os.path.splitext(item["filename"])[1].lower() or ".png"
+            safe_date = re.sub(r"[^a-zA-Z0-9_-]", "_", date)
+            # A short random suffix keeps same-day images of a patient apart
+            item["path"] = f"radiographs/{item['patient_id']}_{safe_date}_{uuid.uuid4().hex[:8]}{extension}"
+
+            content_type = mimetypes.guess_type(item["filename"])[0] or "application/octet-stream"
+            storage = self.supabase.storage.from_(self.bucket)
+            storage.upload(item["path"], data, {"content-type": content_type})
+            item["url"] = storage.get_public_url(item["path"])
+            try:
+                item["derivatives"] = store_derivatives(self.supabase, item["path"], data, self.bucket)
+            except Exception as e:
+                # The backfill job generates them later; the original is what matters
+                print(f"Failed to store derivatives of {item['filename']}: {e}")
+        except Exception as e:
+            item.update(status=FAILED, error=str(e))
+
+    def _insert_rows(self, items):
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start:start + self.batch_size]
+            rows = [
+                {
+                    "patient_id": item["patient_id"], "url": item["url"], "report": item["report"], "date": item["date"],
+                    **item.get("derivatives", {}),
+                }
+                for item in batch
+            ]
+            try:
+                response = self.supabase.table('Radiographs').insert(rows).execute()
+                if len(response.data or []) != len(batch):
+                    raise RuntimeError("Failed to save radiograph metadata")
+            except Exception as e:
+                for item in batch:
+                    item.update(status=FAILED, error=str(e))
+                self._remove_files([path for item in batch for path in self._stored_files(item)])
+                continue
+            # PostgREST returns the inserted rows in request order
+            for item, row in zip(batch, response.data):
+                item.update(status=CREATED, id=row.get("id"))
+            try:
+                record_findings(self.supabase, response.data)
+            except Exception as e:
+                print(f"Failed to record radiograph findings: {e}")
+
+    @staticmethod
+    def _stored_files(item):
+        return [item["path"], *derivative_files(item.get("derivatives", {}))]
+
+    def _remove_files(self, paths):
+        # Best effort: a row-less image is only wasted space
+        try:
+            self.supabase.storage.from_(self.bucket).remove(paths)
+        except Exception as e:
+            print(f"Failed to remove orphaned radiograph files: {e}")
+
+    @staticmethod
+    def _status(item):
+        status = {"index": item["index"], "filename": item["filename"], "status": item["status"]}
+        if item["status"] == CREATED:
+            status.update(id=item.get("id"), patient_id=item["patient_id"], url=item["url"])
+        else:
+            status["error"] = item["error"]
+        return status
@@ -0,0 +1,118 @@
+import os
+import cv2
+import numpy as np
+from config import Config
+
+# Encodings of the derived images: format -> (extension, mimetype, encoder parameters for a quality)
+DERIVATIVE_FORMATS = {
+    "webp": (".webp", "image/webp", lambda quality: [cv2.IMWRITE_WEBP_QUALITY, quality]),
+    # Progressive JPEGs show a coarse full image first while the rest arrives
+    "jpeg": (".jpg", "image/jpeg", lambda quality: [
+        cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_PROGRESSIVE, 1, cv2.IMWRITE_JPEG_OPTIMIZE, 1,
+    ]),
+}
+
+# Decoder flags per reduction factor
+REDUCED_DECODE_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    1: cv2.IMREAD_COLOR,
+}
+
+
+def storage_path(url, folder="radiographs"):
+    """Storage path of a file from its public URL, e.g. "radiographs/12_2024-01-01.png"."""
+    file_name = url.split('?')[0].split('/')[-1]
+    return f"{folder}/{file_name}"
+
+
+def derivative_paths(original_path, output_format="webp"):
+    """Storage paths of the preview and thumbnail, next to the original."""
+    stem = os.path.splitext(original_path)[0]
+    extension = DERIVATIVE_FORMATS[output_format][0]
+    return {"preview": f"{stem}_preview{extension}", "thumbnail": f"{stem}_thumb{extension}"}
+
+
+def _decode(image_data, min_long_side):
+    """Decode at the largest reduction that keeps the long side at or above `min_long_side`."""
+    data = np.frombuffer(image_data, np.uint8)
+    if bytes(image_data[:2]) != b"\xff\xd8":
+        # Only JPEG decoders downscale while decoding; other formats decode in full anyway
+        image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Could not decode the radiograph")
+        return image
+    # The smallest decode of a JPEG is cheap and tells the full size
+    image = cv2.imdecode(data, REDUCED_DECODE_FLAGS[8])
+    if image is None:
+        raise ValueError("Could not decode the radiograph")
+    full_size = max(image.shape[:2]) * 8
+    reduction = max((r for r in REDUCED_DECODE_FLAGS if full_size // r >= min_long_side), default=1)
+    if reduction == 8:
+        return image
+    return cv2.imdecode(data, REDUCED_DECODE_FLAGS[reduction])
+
+
+def _fit(image, max_side):
+    """Downscale `image` so that its long side is at most `max_side`; never upscales."""
+    height, width = image.shape[:2]
+    scale = max_side / max(height, width)
+    if scale >= 1:
+        return image
+    return cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))), interpolation=cv2.INTER_AREA)
+
+
+def make_derivatives(image_data, preview_size=1600, thumbnail_size=256, output_format="webp", quality=80):
+    """
+    Build the web preview and the list thumbnail of a radiograph.
+
+    Large JPEGs are decoded at a reduced resolution straight away, and the
+    thumbnail is scaled from the preview rather than from the original.
+
+    Returns:
+        dict: "preview" and "thumbnail" -> (encoded bytes, mimetype).
+    """
+    extension, mimetype, params = DERIVATIVE_FORMATS[output_format]
+    preview = _fit(_decode(image_data, preview_size), preview_size)
+    thumbnail = _fit(preview, thumbnail_size)
+
+    derivatives = {}
+    for name, image in (("preview", preview), ("thumbnail", thumbnail)):
+        ok, encoded = cv2.imencode(extension, image, params(int(quality)))
+        if not ok:
+            raise ValueError(f"Could not encode the {name}")
+        derivatives[name] = (encoded.tobytes(), mimetype)
+    return derivatives
+
+
+def store_derivatives(supabase, original_path, image_data, bucket="radiographs"):
+    """
+    Generate the derivatives of a stored radiograph and upload them next to it.
+
+    Existing derivatives are overwritten, so a re-run (e.g. of the backfill)
+    is harmless.
+
+    Returns:
+        dict: The `preview_url` and `thumbnail_url` columns of its Radiographs row.
+    """
+    output_format = Config.DERIVATIVE_FORMAT
+    derivatives = make_derivatives(
+        image_data,
+        preview_size=Config.PREVIEW_MAX_SIZE,
+        thumbnail_size=Config.THUMBNAIL_SIZE,
+        output_format=output_format,
+        quality=Config.DERIVATIVE_QUALITY,
+    )
+    storage = supabase.storage.from_(bucket)
+    columns = {}
+    for name, path in derivative_paths(original_path, output_format).items():
+        data, mimetype = derivatives[name]
+        storage.upload(path, data, {"content-type": mimetype, "upsert": "true"})
+        columns[f"{name}_url"] = storage.get_public_url(path)
+    return columns
+
+
+def derivative_files(radiograph):
+    """Storage paths of the derivatives recorded on a Radiographs row, for deletion."""
+    return [storage_path(radiograph[column]) for column in ("preview_url", "thumbnail_url") if radiograph.get(column)]
@@ -0,0 +1,194 @@
+import json
+import os
+import cv2
+import numpy as np
+
+# Same defaults as ultralytics' predict()
+CONF_THRESHOLD = 0.25
+IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+DEFAULT_IMGSZ = 640
+
+
+class Boxes:
+    """The part of ultralytics' `Boxes` that the analysis uses: `xyxy`, `conf` and `cls` arrays."""
+
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.asarray(conf, dtype=np.float32)
+        self.cls = np.asarray(cls, dtype=np.float32)
+
+
+class Detections:
+    """Detections of one image, shaped like an ultralytics `Results` (`result.boxes`)."""
+
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+def letterbox(image, size):
+    """Resize keeping the aspect ratio and pad to `size` x `size`, like ultralytics' LetterBox."""
+    height, width = image.shape[:2]
+    gain = min(size / height, size / width)
+    new_width, new_height = round(width * gain), round(height * gain)
+    if (new_width, new_height) != (width, height):
+        image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (size - new_width) / 2, (size - new_height) / 2
+    top, left = round(pad_y - 0.1), round(pad_x - 0.1)
+    bottom, right = size - new_height - top, size - new_width - left
+    image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+    return image, gain, (left, top)
+
+
+class ExportedDetector:
+    """
+    A YOLO detector exported from ultralytics, run without torch or ultralytics.
+
+    Subclasses only implement `_forward` (a float32 NCHW batch in, the raw
+    `(batch, 4 + classes, anchors)` prediction out); letterboxing, confidence
+    filtering, NMS and mapping boxes back to image coordinates are shared.
+    Calling the detector mirrors `YOLO.__call__`: a list of images in, one
+    result with `.boxes.xyxy/.conf/.cls` per image out.
+    """
+
+    # Exports with a fixed batch dimension of 1 are run image by image
+    fixed_batch = None
+    fixed_imgsz = None
+
+    def __init__(self, path, threads=0):
+        self.path = path
+        self.threads = threads
+
+    def _forward(self, batch):
+        raise NotImplementedError
+
+    def __call__(self, images, verbose=False, imgsz=None, conf=CONF_THRESHOLD, iou=IOU_THRESHOLD):
+        if isinstance(images, np.ndarray):
+            images = [images]
+        size = self.fixed_imgsz or imgsz or DEFAULT_IMGSZ
+
+        inputs, transforms = [], []
+        for image in images:
+            padded, gain, pad = letterbox(image, size)
+            # BGR HWC uint8 -> RGB CHW float in [0, 1]
+            inputs.append(padded[:, :, ::-1].transpose(2, 0, 1))
+            transforms.append((gain, pad, image.shape[:2]))
+        batch = np.ascontiguousarray(np.stack(inputs), dtype=np.float32) / 255.0
+
+        if self.fixed_batch == 1:
+            predictions = np.concatenate([self._forward(batch[i:i + 1]) for i in range(len(images))])
+        else:
+            predictions = self._forward(batch)
+        return [
+            self._postprocess(prediction, gain, pad, shape, conf, iou)
+            for prediction, (gain, pad, shape) in zip(predictions, transforms)
+        ]
+
+    @staticmethod
+    def _postprocess(prediction, gain, pad, shape, conf, iou):
+        # (4 + classes, anchors) -> one row per anchor: cx, cy, w, h, class scores
+        prediction = prediction.T
+        scores = prediction[:, 4:]
+        classes = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), classes]
+        keep = confidences > conf
+        boxes, classes, confidences = prediction[keep, :4], classes[keep], confidences[keep]
+
+        # NMSBoxesBatched works on (x, y, w, h) and keeps classes apart
+        xywh = np.column_stack([boxes[:, 0] - boxes[:, 2] / 2, boxes[:, 1] - boxes[:, 3] / 2, boxes[:, 2], boxes[:, 3]])
+        indices = cv2.dnn.NMSBoxesBatched(xywh.tolist(), confidences.tolist(), classes.tolist(), conf, iou)
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)[:MAX_DETECTIONS]
+
+        xyxy = np.column_stack([xywh[indices, 0], xywh[indices, 1],
+                                xywh[indices, 0] + xywh[indices, 2], xywh[indices, 1] + xywh[indices, 3]])
+        xyxy = (xyxy - np.array([pad[0], pad[1], pad[0], pad[1]])) / gain
+        height, width = shape
+        xyxy = np.clip(xyxy, 0, [width, height, width, height])
+        return Detections(Boxes(xyxy, confidences[indices], classes[indices]))
+
+
+class OnnxRuntimeDetector(ExportedDetector):
+    def __init__(self, path, threads=0):
+        super().__init__(path, threads)
+        # Imported here so the PyTorch backend does not need onnxruntime installed
+        import onnxruntime
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, _ = model_input.shape
+        self.fixed_batch = batch if isinstance(batch, int) else None
+        self.fixed_imgsz = height if isinstance(height, int) else None
+
+    def _forward(self, batch):
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVinoDetector(ExportedDetector):
+    def __init__(self, path, threads=0):
+        super().__init__(path, threads)
+        import openvino as ov
+        core = ov.Core()
+        model = core.read_model(path)
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if threads:
+            config["INFERENCE_NUM_THREADS"] = threads
+        self.compiled_model = core.compile_model(model, "CPU", config)
+        shape = model.inputs[0].get_partial_shape()
+        self.fixed_batch = shape[0].get_length() if shape[0].is_static else None
+        self.fixed_imgsz = shape[2].get_length() if shape[2].is_static else None
+
+    def _forward(self, batch):
+        return self.compiled_model(batch)[0]
+
+
+class TorchScriptDetector(ExportedDetector):
+    def __init__(self, path, threads=0):
+        super().__init__(path, threads)
+        import torch
+        if threads:
+            torch.set_num_threads(threads)
+        self._torch = torch
+        # ultralytics exports TorchScript with a fixed input size, recorded in config.txt
+        extra_files = {"config.txt": ""}
+        self.model = torch.jit.load(path, map_location="cpu", _extra_files=extra_files).eval()
+        metadata = json.loads(extra_files["config.txt"] or "{}")
+        self.fixed_imgsz = (metadata.get("imgsz") or [DEFAULT_IMGSZ])[0]
+
+    def _forward(self, batch):
+        with self._torch.inference_mode():
+            output = self.model(self._torch.from_numpy(batch))
+        if isinstance(output, (list, tuple)):
+            output = output[0]
+        return output.numpy()
+
+
+def create_detector(path, runtime="onnxruntime", threads=0):
+    """
+    Load a detector with the backend its file calls for.
+
+    `.pt` weights go through ultralytics and PyTorch; exported models run on a
+    lean backend: `.onnx` on ONNX Runtime (or OpenVINO with `runtime="openvino"`),
+    OpenVINO IR (`.xml` or an `*_openvino_model` directory) on OpenVINO and
+    `.torchscript` on TorchScript.
+    """
+    if os.path.isdir(path) and path.rstrip("/").endswith("_openvino_model"):
+        path = next(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".xml"))
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".onnx":
+        if runtime == "openvino":
+            return OpenVinoDetector(path, threads)
+        return OnnxRuntimeDetector(path, threads)
+    if extension == ".xml":
+        return OpenVinoDetector(path, threads)
+    if extension == ".torchscript":
+        return TorchScriptDetector(path, threads)
+
+    # Imported here so that importing the app does not pull in torch
+    from ultralytics import YOLO
+    return YOLO(path)
@@ -0,0 +1,128 @@
+import json
+from collections import defaultdict
+from services.listing import listing_cache
+
+# One row per tooth and anomaly of every radiograph, and one per patient, tooth and anomaly
+# with when it was first and last seen: both are kept up to date as radiographs are saved
+FINDINGS_TABLE = 'Findings'
+SUMMARY_TABLE = 'FindingSummaries'
+
+
+def normalize_report(report):
+    """
+    Per-tooth findings of a stored report (JSON of tooth number -> anomaly names).
+
+    Returns:
+        list: `(tooth, anomaly)` pairs, without duplicates, in tooth order.
+    """
+    if isinstance(report, str):
+        try:
+            report = json.loads(report)
+        except ValueError:
+            return []
+    if not isinstance(report, dict):
+        return []
+
+    findings = []
+    for tooth, names in report.items():
+        if not str(tooth).isdigit() or not isinstance(names, list):
+            continue
+        for name in names:
+            if (int(tooth), name) not in findings:
+                findings.append((int(tooth), name))
+    return sorted(findings, key=lambda finding: finding[0])
+
+
+def record_findings(supabase, radiographs):
+    """
+    Store the findings of newly saved radiographs and fold them into the summaries.
+
+    One round trip per call whatever the number of radiographs, so bulk
+    uploads pass a whole insert batch at once. The `record_findings` SQL
+    function inserts the rows and folds them into FindingSummaries with
+    `on conflict do update` in one transaction, so concurrent saves for the
+    same patient never lose a count or a first/last-seen date.
+
+    Args:
+        radiographs (list): Radiographs rows with `id`, `patient_id`, `date` and `report`.
+    """
+    rows = [
+        {"radiograph_id": radiograph["id"], "patient_id": radiograph["patient_id"],
+         "tooth": tooth, "anomaly": anomaly, "date": radiograph["date"]}
+        for radiograph in radiographs
+        for tooth, anomaly in normalize_report(radiograph["report"])
+    ]
+    if not rows:
+        return
+    supabase.rpc('record_findings', {"findings": rows}).execute()
+
+    for patient_id in {str(row["patient_id"]) for row in rows}:
+        listing_cache.invalidate('findings', patient_id)
+
+
+def rebuild_summaries(supabase, patient_id, teeth=None):
+    """Recompute the summaries of a patient (or of some of its teeth) from its findings, in the database."""
+    supabase.rpc('rebuild_finding_summaries', {
+        "p_patient_id": patient_id,
+        "p_teeth": sorted(teeth) if teeth is not None else None,
+    }).execute()
+    listing_cache.invalidate('findings', patient_id)
+
+
+def forget_findings(supabase, radiograph):
+    """Remove the findings of a deleted radiograph; only its teeth's summaries are recomputed."""
+    teeth = {tooth for tooth, _ in normalize_report(radiograph.get("report"))}
+    supabase.table(FINDINGS_TABLE).delete().eq('radiograph_id', radiograph["id"]).execute()
+    if teeth:
+        rebuild_summaries(supabase, radiograph["patient_id"], teeth)
+
+
+def patient_summary(supabase, patient_id):
+    """Every anomaly ever found on a patient's teeth, with when it was first and last seen."""
+    return supabase.table(SUMMARY_TABLE).select('tooth,anomaly,first_seen,last_seen,radiographs') \
+        .eq('patient_id', patient_id).order('tooth').order('first_seen').execute().data or []
+
+
+def new_findings(supabase, patient_id, since):
+    """Tooth/anomaly pairs first seen after `since` (ISO date)."""
+    return supabase.table(SUMMARY_TABLE).select('tooth,anomaly,first_seen,last_seen,radiographs') \
+        .eq('patient_id', patient_id).gt('first_seen', since).order('first_seen').order('tooth').execute().data or []
+
+
+def tooth_history(supabase, patient_id, tooth):
+    """
+    Findings of one tooth across a patient's radiographs, oldest first.
+
+    Returns:
+        list: `{"radiograph_id", "date", "anomalies"}` for every radiograph with findings on the tooth.
+    """
+    findings = supabase.table(FINDINGS_TABLE).select('radiograph_id,anomaly,date') \
+        .eq('patient_id', patient_id).eq('tooth', tooth).order('date').order('radiograph_id').execute().data or []
+
+    history = []
+    for finding in findings:
+        if not history or history[-1]["radiograph_id"] != finding["radiograph_id"]:
+            history.append({"radiograph_id": finding["radiograph_id"], "date": finding["date"], "anomalies": []})
+        history[-1]["anomalies"].append(finding["anomaly"])
+    return history
+
+
+def summary_report(summaries):
+    """The summaries as a report (tooth number -> anomaly names), e.g. for the /chat snippet lookup."""
+    report = defaultdict(list)
+    for summary in summaries:
+        report[str(summary["tooth"])].append(summary["anomaly"])
+    return dict(report)
+
+
+def summary_text(summaries):
+    """One compact line per tooth for the /chat prompt, e.g. 'Tooth 12: Caries (2023-01-05 to 2024-03-02, 3 radiographs)'."""
+    lines = defaultdict(list)
+    for summary in summaries:
+        first, last = summary["first_seen"][:10], summary["last_seen"][:10]
+        seen = first if first == last else f"{first} to {last}"
+        count = summary["radiographs"]
+        lines[summary["tooth"]].append(f"{summary['anomaly']} ({seen}, {count} radiograph{'s' if count != 1 else ''})")
+    if not lines:
+        return "No anomalies detected in the patient's radiographs."
+    return "\n".join(f"Tooth {tooth}: {', '.join(items)}" for tooth, items in sorted(lines.items()))
@@ -0,0 +1,132 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from config import Config
+from services.model_registry import model_registry
+from services.tiling import make_tiles, merge_tiles
+
+
+class InferenceEngine:
+    """
+    Micro-batching front end for the two YOLO detectors.
+
+    Request threads call `predict` with a decoded image and block until their
+    result is ready. A single background thread collects the images that arrive
+    within `window_ms` of the first one (up to `max_batch`), runs each detector
+    once on the whole batch and hands every caller its own pair of results. If
+    the batch fails, its images are run again one at a time, so one bad upload
+    only fails its own request.
+
+    Detectors listed in `tiled_models` see images larger than `tile_size` as
+    overlapping tiles instead (run in batches of `max_batch` tiles), and their
+    boxes are merged back into full-image coordinates with cross-tile NMS.
+    `imgsz` overrides the detectors' input size when set.
+    """
+
+    def __init__(self, registry, window_ms=20, max_batch=4, imgsz=None, tile_size=0, tile_overlap=0,
+                 tiled_models=(), tile_nms_threshold=0.6, timeout=120):
+        self._registry = registry
+        self.timeout = timeout
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.imgsz = imgsz or None
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.tiled_models = set(tiled_models) if tile_size else set()
+        self.tile_nms_threshold = tile_nms_threshold
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Threads do not survive fork(), so each worker process starts its own
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="inference-engine", daemon=True)
+            self._thread.start()
+
+    def predict(self, image, timeout=None):
+        """
+        Return `(anomalies_result, teeth_result)` for a single BGR image.
+
+        Raises `concurrent.futures.TimeoutError` after `timeout` seconds (default:
+        the engine's), e.g. if the engine thread died, instead of blocking forever.
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((image, future))
+        return future.result(timeout if timeout is not None else self.timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            self._run_batch(self._collect())
+
+    def _run_model(self, name, images):
+        model = self._registry.get(name)
+        kwargs = {"verbose": False}
+        if self.imgsz:
+            kwargs["imgsz"] = self.imgsz
+        if name not in self.tiled_models:
+            return model(images, **kwargs)
+
+        tiles, origins = [], []
+        for index, image in enumerate(images):
+            for x, y, tile in make_tiles(image, self.tile_size, self.tile_overlap):
+                tiles.append(tile)
+                origins.append((index, x, y))
+        # Bounded tile batches keep peak memory flat on very large radiographs
+        results = []
+        for start in range(0, len(tiles), self.max_batch):
+            results.extend(model(tiles[start:start + self.max_batch], **kwargs))
+        return merge_tiles(results, origins, len(images), self.tile_nms_threshold)
+
+    def _run_batch(self, batch):
+        images = [image for image, _ in batch]
+        try:
+            results_anomalies = self._run_model('anomalies', images)
+            results_teeth = self._run_model('teeth', images)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # Find out which image failed: every other request still gets its result
+            for item in batch:
+                self._run_batch([item])
+            return
+
+        for (_, future), result_anomalies, result_teeth in zip(batch, results_anomalies, results_teeth):
+            future.set_result((result_anomalies, result_teeth))
+
+
+inference_engine = InferenceEngine(
+    model_registry,
+    window_ms=Config.INFERENCE_BATCH_WINDOW_MS,
+    max_batch=Config.INFERENCE_MAX_BATCH,
+    imgsz=Config.INFERENCE_IMGSZ,
+    tile_size=Config.INFERENCE_TILE_SIZE,
+    tile_overlap=Config.INFERENCE_TILE_OVERLAP,
+    tiled_models=Config.INFERENCE_TILED_MODELS,
+    tile_nms_threshold=Config.INFERENCE_TILE_NMS_THRESHOLD,
+    timeout=Config.INFERENCE_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,57 @@
+import numpy as np
+
+
+def split_jaws(centers_y):
+    """
+    Split tooth center y-coordinates into upper and lower jaw.
+
+    This is the optimal 1-D two-cluster split (what KMeans(n_clusters=2)
+    converges to): sort once, then scan every gap with prefix sums and keep the
+    one with the lowest within-cluster sum of squares. O(n log n), deterministic.
+
+    Returns:
+        np.ndarray: boolean mask, True for teeth in the upper jaw. With fewer
+        than two distinct values everything is treated as upper jaw.
+    """
+    y = np.asarray(centers_y, dtype=np.float64).ravel()
+    n = len(y)
+    is_upper = np.ones(n, dtype=bool)
+    if n < 2:
+        return is_upper
+
+    order = np.argsort(y, kind='stable')
+    sorted_y = y[order]
+    if sorted_y[0] == sorted_y[-1]:
+        return is_upper
+
+    csum = np.cumsum(sorted_y)
+    csq = np.cumsum(sorted_y * sorted_y)
+    left_n = np.arange(1, n)
+    right_n = n - left_n
+    left_sum, left_sq = csum[:-1], csq[:-1]
+    right_sum, right_sq = csum[-1] - left_sum, csq[-1] - left_sq
+    cost = (left_sq - left_sum ** 2 / left_n) + (right_sq - right_sum ** 2 / right_n)
+
+    # Never split between equal values, they belong to the same jaw
+    cost[sorted_y[:-1] == sorted_y[1:]] = np.inf
+    split = int(np.argmin(cost)) + 1
+    is_upper[order[split:]] = False
+    return is_upper
+
+
+def number_teeth(teeth_boxes):
+    """
+    Order tooth boxes by tooth number: upper jaw left to right, then lower jaw
+    left to right.
+    """
+    if not teeth_boxes:
+        return []
+    centers_y = [(y1 + y2) / 2 for (_, y1, _, y2) in teeth_boxes]
+    is_upper = split_jaws(centers_y)
+
+    def center_x(box):
+        return (box[0] + box[2]) / 2
+
+    upper_teeth = sorted([tb for tb, upper in zip(teeth_boxes, is_upper) if upper], key=center_x)
+    lower_teeth = sorted([tb for tb, upper in zip(teeth_boxes, is_upper) if not upper], key=center_x)
+    return upper_teeth + lower_teeth
@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config import Config
+from services.report_store import report_store
+from services.result_cache import result_cache, model_version
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+def _init_worker():
+    # Each worker process holds its own copy of the detectors
+    from services.model_registry import model_registry
+    model_registry.load_all()
+
+
+def _run_job(image_bytes):
+    from services.analysis import analyze_upload
+    return analyze_upload(image_bytes)
+
+
+class JobQueue:
+    """
+    Runs the /upload pipeline on a pool of worker processes, so HTTP threads
+    only enqueue work and poll for it.
+
+    Job state is kept by the process that accepted the job and written through
+    to the report store (under "job:<id>"), so with REPORT_STORE=sqlite a poll
+    can land on any worker. Finished reports go to the report store under the
+    job ID and annotated images to the result cache; with RESULT_CACHE_DIR set,
+    its disk tier lets every worker serve them.
+    """
+
+    def __init__(self, workers=1, ttl_seconds=3600):
+        self.workers = max(1, workers)
+        self.ttl = ttl_seconds
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def _get_executor(self):
+        # A pool inherited through fork() has no live workers, so create one per process
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    # spawn, not fork: torch thread pools are not fork-safe
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _expire(self):
+        now = time.time()
+        for job_id in [job_id for job_id, job in self._jobs.items() if job["updated_at"] + self.ttl < now]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _store_key(job_id):
+        return f"job:{job_id}"
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields, updated_at=time.time())
+            job = dict(job)
+        report_store.put(job, report_id=self._store_key(job_id))
+
+    def submit(self, image_bytes):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        job = {"id": job_id, "status": PENDING, "error": None, "created_at": now, "updated_at": now}
+        with self._lock:
+            self._expire()
+            self._jobs[job_id] = job
+        report_store.put(dict(job), report_id=self._store_key(job_id))
+
+        cache_key = result_cache.key(image_bytes, model_version())
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            self._finish(job_id, cache_key, cached)
+            return job_id
+
+        try:
+            future = self._get_executor().submit(_run_job, image_bytes)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool and try once more
+            with self._lock:
+                self._executor = None
+            future = self._get_executor().submit(_run_job, image_bytes)
+        future.add_done_callback(lambda f: self._on_done(job_id, cache_key, f))
+        return job_id
+
+    def _on_done(self, job_id, cache_key, future):
+        try:
+            analysis = future.result()
+        except Exception as e:
+            self._update(job_id, status=FAILED, error=str(e))
+            return
+        result_cache.put(cache_key, analysis)
+        self._finish(job_id, cache_key, analysis)
+
+    def _finish(self, job_id, cache_key, analysis):
+        report_store.put(analysis["report"], report_id=job_id)
+        self._update(job_id, status=DONE, cache_key=cache_key)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+        # Accepted by another worker
+        return report_store.get(self._store_key(job_id))
+
+
+job_queue = JobQueue(workers=Config.ANALYSIS_WORKERS, ttl_seconds=Config.REPORT_TTL_SECONDS)
@@ -0,0 +1,196 @@
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from flask import Response, current_app, request
+from config import Config
+
+FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class ListingError(ValueError):
+    """Invalid listing parameters; reported to the client as a 400."""
+
+
+def parse_fields(raw, required=()):
+    """
+    Turn a `fields=a,b,c` parameter into a PostgREST select list.
+
+    The columns in `required` (the keyset columns) are always selected, since
+    the next cursor is built from them.
+    """
+    if not raw:
+        return '*'
+    fields = [field.strip() for field in raw.split(',') if field.strip()]
+    for field in fields:
+        if not FIELD_NAME.match(field):
+            raise ListingError(f"Invalid field '{field}'")
+    fields += [column for column in required if column not in fields]
+    return ','.join(fields)
+
+
+def parse_limit(raw):
+    if raw is None:
+        return Config.LIST_PAGE_SIZE
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ListingError("limit must be an integer")
+    if limit < 1:
+        raise ListingError("limit must be positive")
+    return min(limit, Config.LIST_MAX_PAGE_SIZE)
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, UnicodeDecodeError):
+        raise ListingError("Invalid cursor")
+
+
+def _quote(value):
+    # Double quotes keep commas, dots and colons inside PostgREST logic filters literal
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def keyset_page(query, order, cursor, limit):
+    """
+    Apply keyset pagination to a PostgREST select query and run it.
+
+    Args:
+        query: A select query on the table, already filtered by owner.
+        order (list): `(column, descending)` pairs; the last column must be unique.
+            One or two columns are supported.
+        cursor (str): `next_cursor` of the previous page, or None for the first page.
+        limit (int): Page size.
+
+    Returns:
+        tuple: The rows of the page and the cursor of the next page (None on the last page).
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        if not isinstance(values, list) or len(values) != len(order):
+            raise ListingError("Invalid cursor")
+        ops = ['lt' if descending else 'gt' for _, descending in order]
+        if len(order) == 1:
+            query = query.filter(order[0][0], ops[0], values[0])
+        else:
+            (first, _), (second, _) = order
+            query = query.or_(
+                f"{first}.{ops[0]}.{_quote(values[0])},"
+                f"and({first}.eq.{_quote(values[0])},{second}.{ops[1]}.{_quote(values[1])})"
+            )
+    for column, descending in order:
+        query = query.order(column, desc=descending)
+
+    # One extra row tells whether there is a next page without a count query
+    rows = query.limit(limit + 1).execute().data or []
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([rows[-1][column] for column, _ in order])
+
+
+class ListingCache:
+    """
+    Short-lived per-owner cache of serialized listing pages, with their ETags.
+
+    Entries are scoped by `(scope, owner)`, e.g. ("patients", user_id), and
+    `invalidate` drops every cached page of an owner after a write. A page
+    is stored under the generation current when its load started, so a load
+    that raced with a write is never cached as fresh.
+
+    The cache and its invalidation are per worker process: under several
+    gunicorn workers, a write served by another worker is only seen here
+    once the TTL runs out, so keep LIST_CACHE_TTL_SECONDS short there.
+    """
+
+    def __init__(self, ttl_seconds=15, max_entries=1000):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, scope, owner):
+        """Take this before loading a page and pass it to `get`/`put`."""
+        with self._lock:
+            return self._generations.get((scope, str(owner)), 0)
+
+    def get(self, scope, owner, params, generation):
+        with self._lock:
+            key = (scope, str(owner), generation, params)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, scope, owner, params, generation, etag, body):
+        with self._lock:
+            if generation != self._generations.get((scope, str(owner)), 0):
+                # Invalidated while the page was loading: it may already be stale
+                return
+            key = (scope, str(owner), generation, params)
+            self._entries[key] = (time.time() + self.ttl, etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, scope, owner):
+        with self._lock:
+            owner_key = (scope, str(owner))
+            self._generations[owner_key] = self._generations.get(owner_key, 0) + 1
+            for key in [key for key in self._entries if key[:2] == owner_key]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+def cached_listing(scope, owner, params, load):
+    """
+    Serve a listing page from the cache or `load()`, with ETag / If-None-Match support.
+
+    Returns:
+        Response: The JSON page, or 304 Not Modified if the client already has it.
+    """
+    generation = listing_cache.generation(scope, owner)
+    cached = listing_cache.get(scope, owner, params, generation)
+    if cached is None:
+        body = current_app.json.dumps(load())
+        etag = hashlib.sha1(body.encode()).hexdigest()
+        listing_cache.put(scope, owner, params, generation, etag, body)
+    else:
+        etag, body = cached
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    # Browsers may keep the page but must revalidate it on every use
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+listing_cache = ListingCache(ttl_seconds=Config.LIST_CACHE_TTL_SECONDS, max_entries=Config.LIST_CACHE_MAX_ENTRIES)
@@ -0,0 +1,149 @@
+import json
+import os
+import shutil
+import threading
+import numpy as np
+
+VECTORS_FILE = "vectors.npy"
+DOCUMENTS_FILE = "documents.json"
+VERSION_FILE = "version.txt"
+VERSIONS_DIR = "versions"
+# Versions kept besides the current one, for workers still reading them
+KEEP_VERSIONS = 1
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _document(page_content, metadata):
+    from langchain_core.documents import Document
+    return Document(page_content=page_content, metadata=metadata or {})
+
+
+class LocalVectorIndex:
+    """
+    In-process copy of the knowledge base collection.
+
+    Vectors are stored normalized in a memory-mapped .npy matrix, so cosine
+    similarity is a single matrix-vector product; brute force is exact and fast
+    enough for a few thousand chunks. Exposes the parts of the langchain vector
+    store API that /chat uses, and reloads itself when scripts/ingest.py writes
+    a new version.
+
+    Each version lives in its own `versions/<version>/` directory and
+    version.txt points at the current one, so a reload always reads the
+    vectors and documents of a single version.
+    """
+
+    def __init__(self, directory, embedding=None):
+        self.directory = directory
+        self.embedding = embedding
+        self._lock = threading.Lock()
+        self._version = None
+        self._load()
+
+    def _read_version(self):
+        try:
+            with open(os.path.join(self.directory, VERSION_FILE)) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _load(self):
+        version = self._read_version()
+        if version is None:
+            raise FileNotFoundError(f"No local vector index in {self.directory}; run scripts/ingest.py first")
+        directory = os.path.join(self.directory, VERSIONS_DIR, version)
+        if not os.path.isdir(directory):
+            # Index written before versions had their own directory
+            directory = self.directory
+        vectors = np.load(os.path.join(directory, VECTORS_FILE), mmap_mode="r")
+        with open(os.path.join(directory, DOCUMENTS_FILE), encoding="utf-8") as f:
+            documents = json.load(f)
+        self._vectors, self._documents, self._version = vectors, documents, version
+
+    def version(self):
+        version = self._read_version()
+        if version is not None and version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._load()
+        return self._version
+
+    def similarity_search_with_score_by_vector(self, embedding, k=4):
+        vectors, documents = self._vectors, self._documents
+        if len(documents) == 0:
+            return []
+        scores = vectors @ _normalize(embedding)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(_document(**documents[i]), float(scores[i])) for i in top]
+
+    def similarity_search_by_vector(self, embedding, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k)]
+
+    def similarity_search(self, query, k=4, **kwargs):
+        return self.similarity_search_by_vector(self.embedding.embed_query(query), k)
+
+
+def write_local_index(directory, vectors, documents, version):
+    """
+    Write the index into `versions/<version>/`, then point version.txt at it
+    with a single atomic rename, so readers never see a half-written or mixed
+    index. Older versions beyond KEEP_VERSIONS are removed.
+    """
+    versions = os.path.join(directory, VERSIONS_DIR)
+    os.makedirs(versions, exist_ok=True)
+    if len(documents) == 0:
+        # Empty collection: nothing to reshape, searches return no results
+        vectors = np.zeros((0, 0), dtype=np.float32)
+    else:
+        vectors = _normalize(vectors).reshape(len(documents), -1)
+
+    tmp = os.path.join(versions, f".tmp-{version}-{os.getpid()}")
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, VECTORS_FILE), vectors)
+    with open(os.path.join(tmp, DOCUMENTS_FILE), "w", encoding="utf-8") as f:
+        json.dump(documents, f)
+    os.replace(tmp, os.path.join(versions, version))
+
+    pointer = os.path.join(directory, f".tmp-{os.getpid()}-{VERSION_FILE}")
+    with open(pointer, "w") as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(directory, VERSION_FILE))
+    _prune_versions(versions, version)
+
+
+def _prune_versions(versions, current):
+    entries = [entry for entry in os.scandir(versions) if entry.is_dir() and not entry.name.startswith(".")]
+    old = sorted((entry for entry in entries if entry.name != current), key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in old[KEEP_VERSIONS:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def export_collection(client, collection_name, directory, version, batch_size=256):
+    """Copy every point of a Qdrant collection (vectors and langchain payloads) into a local index."""
+    vectors, documents = [], []
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        for point in points:
+            vectors.append(point.vector)
+            documents.append({
+                "page_content": point.payload.get("page_content", ""),
+                "metadata": point.payload.get("metadata") or {},
+            })
+        if offset is None:
+            break
+    write_local_index(directory, np.asarray(vectors, dtype=np.float32), documents, version)
+    return len(documents)
@@ -0,0 +1,114 @@
+import os
+import threading
+import numpy as np
+from config import Config
+from services.detectors import create_detector
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class ModelRegistry:
+    """
+    Keeps one loaded YOLO detector per name for the lifetime of the worker.
+    Weights may be PyTorch `.pt` files or exports for ONNX Runtime, OpenVINO or
+    TorchScript (see services/detectors.py).
+
+    Models are loaded lazily on first use (or eagerly via `load_all`) and warmed
+    with a dummy forward pass. If the weights file on disk changes, or `swap` is
+    called with a new file, the new model is loaded and replaces the old one
+    without restarting the process; requests already running keep the old one.
+    """
+
+    def __init__(self, weights, warmup=True, runtime="onnxruntime", threads=0):
+        self._weights = dict(weights)
+        self._runtime = runtime
+        self._threads = threads
+        self._models = {}
+        self._mtimes = {}
+        # mtime of weights that failed to load, not retried until the file changes again
+        self._failed = {}
+        self._warmup = warmup
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _warm(model):
+        # Dummy pass so the first real request does not pay for fuse/graph setup
+        model(np.zeros((640, 640, 3), dtype=np.uint8), verbose=False)
+
+    def _load(self, path):
+        # .pt weights load through ultralytics; exported models on their own runtime
+        model = create_detector(path, self._runtime, self._threads)
+        if self._warmup:
+            self._warm(model)
+        return model
+
+    def warmup(self):
+        """Run the dummy pass on the models already loaded, e.g. in a worker forked after `load_all`."""
+        for model in list(self._models.values()):
+            self._warm(model)
+
+    def get(self, name):
+        path = self._weights[name]
+        model = self._models.get(name)
+        if model is not None and _mtime(path) in (self._mtimes.get(name), self._failed.get(name)):
+            return model
+
+        with self._lock:
+            path = self._weights[name]
+            mtime = _mtime(path)
+            model = self._models.get(name)
+            if model is not None and mtime in (self._mtimes.get(name), self._failed.get(name)):
+                return model
+            try:
+                new_model = self._load(path)
+            except Exception as e:
+                # A half-copied weights file should not take the service down
+                if model is None:
+                    raise
+                print(f"Failed to reload model '{name}' from {path}: {e}")
+                self._failed[name] = mtime
+                return model
+            self._models[name] = new_model
+            self._mtimes[name] = mtime
+            self._failed.pop(name, None)
+            return new_model
+
+    def loaded(self):
+        return all(name in self._models for name in self._weights)
+
+    def load_all(self):
+        for name in self._weights:
+            self.get(name)
+
+    def swap(self, name, path):
+        """Load the weights at `path` and make them the active model for `name`."""
+        new_model = self._load(path)
+        with self._lock:
+            self._weights[name] = path
+            self._models[name] = new_model
+            self._mtimes[name] = _mtime(path)
+            self._failed.pop(name, None)
+
+    def version(self, name):
+        """Weights the next `get` will serve: the file on disk, unless it already failed to load."""
+        path = self._weights[name]
+        mtime = _mtime(path)
+        if name in self._models and mtime == self._failed.get(name):
+            mtime = self._mtimes[name]
+        return f"{os.path.basename(path)}@{mtime}"
+
+
+model_registry = ModelRegistry(
+    {
+        'anomalies': Config.ANOMALIES_MODEL_PATH,
+        'teeth': Config.TEETH_MODEL_PATH,
+    },
+    warmup=Config.WARMUP_MODELS,
+    runtime=Config.MODEL_RUNTIME,
+    threads=Config.MODEL_THREADS,
+)
@@ -0,0 +1,139 @@
+import json
+import math
+import threading
+from config import Config
+
+
+def count_tokens(text):
+    """
+    Rough token count (~4 characters per token for English). The chat model's
+    tokenizer is not available locally and budgets only need to be approximate.
+    """
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def truncate_to_tokens(text, max_tokens):
+    if count_tokens(text) <= max_tokens:
+        return text
+    cut = text[:max(0, max_tokens * 4 - 3)]
+    # Prefer cutting at a word boundary
+    if " " in cut[-40:]:
+        cut = cut[:cut.rfind(" ")]
+    return cut + "..."
+
+
+def compact_report(report):
+    """'Tooth 12: Caries, Bone Loss' lines for the teeth that have findings only."""
+    if isinstance(report, str):
+        try:
+            report = json.loads(report)
+        except ValueError:
+            return report
+    if not isinstance(report, dict):
+        return "" if report is None else str(report)
+
+    lines = []
+    for tooth, findings in sorted(report.items(), key=lambda item: int(item[0]) if str(item[0]).isdigit() else 0):
+        if findings:
+            names = findings if isinstance(findings, list) else [str(findings)]
+            lines.append(f"Tooth {tooth}: {', '.join(names)}")
+    return "\n".join(lines) if lines else "No anomalies detected."
+
+
+def _format_turn(msg):
+    return f"{msg['sender']}: {msg['text']}"
+
+
+class PromptBudget:
+    """
+    Keeps the /chat system prompt within fixed token budgets.
+
+    - report: only teeth with findings, truncated to `report_tokens`
+    - history: the most recent turns that fit in `history_tokens`; older user
+      questions are folded into a one-line rolling summary
+    - context: retrieved chunks in rank order until `context_tokens` is used
+    """
+
+    def __init__(self, history_tokens=800, context_tokens=1200, report_tokens=400):
+        self.history_tokens = history_tokens
+        self.context_tokens = context_tokens
+        self.report_tokens = report_tokens
+        self._lock = threading.Lock()
+        self._stats = {"prompts": 0, "tokens_before": 0, "tokens_after": 0, "max_tokens_before": 0, "max_tokens_after": 0}
+
+    def history(self, chat_history):
+        kept = []
+        used = 0
+        for msg in reversed(chat_history):
+            turn = _format_turn(msg)
+            tokens = count_tokens(turn)
+            if used + tokens > self.history_tokens:
+                break
+            kept.append(turn)
+            used += tokens
+        kept.reverse()
+
+        older = chat_history[:len(chat_history) - len(kept)]
+        questions = [msg['text'] for msg in older if msg.get('sender') == 'user']
+        if questions:
+            # Give up the oldest kept turns until a quarter of the budget is left for the summary
+            summary_tokens = self.history_tokens // 4
+            while kept and self.history_tokens - used < summary_tokens:
+                used -= count_tokens(kept.pop(0))
+            older = chat_history[:len(chat_history) - len(kept)]
+            questions = [msg['text'] for msg in older if msg.get('sender') == 'user']
+            summary = "Earlier the user asked about: " + "; ".join(q.strip()[:80] for q in questions)
+            kept.insert(0, truncate_to_tokens(summary, self.history_tokens - used))
+        return "\n".join(kept)
+
+    def context(self, chunks):
+        kept = []
+        used = 0
+        for chunk in chunks:
+            tokens = count_tokens(chunk)
+            if used + tokens > self.context_tokens:
+                remaining = self.context_tokens - used
+                if remaining > 50:
+                    kept.append(truncate_to_tokens(chunk, remaining))
+                break
+            kept.append(chunk)
+            used += tokens
+        return "\n\n".join(kept)
+
+    def report(self, report):
+        return truncate_to_tokens(compact_report(report), self.report_tokens)
+
+    def assemble(self, chat_history, report, chunks):
+        """Return (history, report, context) strings within budget, recording before/after sizes."""
+        history_text = self.history(chat_history)
+        report_text = self.report(report)
+        context_text = self.context(chunks)
+
+        before = (count_tokens("\n".join(_format_turn(msg) for msg in chat_history))
+                  + count_tokens(str(report)) + count_tokens("\n\n".join(chunks)))
+        after = count_tokens(history_text) + count_tokens(report_text) + count_tokens(context_text)
+        with self._lock:
+            self._stats["prompts"] += 1
+            self._stats["tokens_before"] += before
+            self._stats["tokens_after"] += after
+            self._stats["max_tokens_before"] = max(self._stats["max_tokens_before"], before)
+            self._stats["max_tokens_after"] = max(self._stats["max_tokens_after"], after)
+        return history_text, report_text, context_text
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+        prompts = s["prompts"]
+        return {
+            **s,
+            "avg_tokens_before": round(s["tokens_before"] / prompts, 1) if prompts else 0.0,
+            "avg_tokens_after": round(s["tokens_after"] / prompts, 1) if prompts else 0.0,
+            "budgets": {"history": self.history_tokens, "context": self.context_tokens, "report": self.report_tokens},
+        }
+
+
+prompt_budget = PromptBudget(
+    history_tokens=Config.CHAT_HISTORY_TOKENS,
+    context_tokens=Config.CHAT_CONTEXT_TOKENS,
+    report_tokens=Config.CHAT_REPORT_TOKENS,
+)
@@ -0,0 +1,91 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from config import Config
+
+
+class MemoryReportStore:
+    """In-process LRU store for upload reports with a time-to-live per entry."""
+
+    def __init__(self, max_entries=1000, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, report, report_id=None):
+        report_id = report_id or uuid.uuid4().hex
+        with self._lock:
+            self._entries[report_id] = (time.time() + self.ttl, report)
+            self._entries.move_to_end(report_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return report_id
+
+    def get(self, report_id):
+        with self._lock:
+            entry = self._entries.get(report_id)
+            if entry is None:
+                return None
+            expires_at, report = entry
+            if expires_at < time.time():
+                del self._entries[report_id]
+                return None
+            self._entries.move_to_end(report_id)
+            return report
+
+
+class SqliteReportStore:
+    """
+    File-backed store shared by every worker on the machine, so a /report call
+    can land on a different worker than the /upload that produced it.
+    """
+
+    def __init__(self, path, ttl_seconds=3600):
+        self.path = path
+        self.ttl = ttl_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                "id TEXT PRIMARY KEY, report TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS reports_expires_at ON reports (expires_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def put(self, report, report_id=None):
+        report_id = report_id or uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM reports WHERE expires_at < ?", (now,))
+            conn.execute(
+                "INSERT OR REPLACE INTO reports (id, report, expires_at) VALUES (?, ?, ?)",
+                (report_id, json.dumps(report), now + self.ttl),
+            )
+        return report_id
+
+    def get(self, report_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT report FROM reports WHERE id = ? AND expires_at >= ?",
+                (report_id, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def create_report_store(config):
+    if config.REPORT_STORE == 'sqlite':
+        return SqliteReportStore(config.REPORT_STORE_PATH, ttl_seconds=config.REPORT_TTL_SECONDS)
+    return MemoryReportStore(max_entries=config.REPORT_STORE_MAX_ENTRIES, ttl_seconds=config.REPORT_TTL_SECONDS)
+
+
+report_store = create_report_store(Config)
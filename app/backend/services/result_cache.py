@@ -0,0 +1,153 @@
+import copy
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from config import Config
+from services.model_registry import model_registry
+
+
+def _entry_size(entry):
+    # The encoded JPEG dominates; boxes and report are a few KB at most
+    return len(entry.get("image", b"")) + 4096
+
+
+class ResultCache:
+    """
+    Content-addressed cache of /upload results.
+
+    Keys are a SHA-256 of the uploaded bytes plus the model versions, so
+    re-uploading the same radiograph skips decoding and inference entirely,
+    while swapping weights invalidates everything. Callers get and store
+    their own copies (the image bytes are shared, being immutable), so a
+    report handed on to the report store never aliases a cached one.
+    Entries live in a size-bounded in-memory LRU and, if `disk_dir` is set,
+    in a bounded on-disk tier that survives restarts and is shared between
+    workers.
+    """
+
+    def __init__(self, max_bytes, disk_dir=None, disk_max_bytes=0):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def key(image_bytes, model_version=""):
+        digest = hashlib.sha256(image_bytes)
+        digest.update(model_version.encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry)
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._put_memory(key, copy.deepcopy(entry))
+        return entry
+
+    def put(self, key, entry):
+        self._put_memory(key, copy.deepcopy(entry))
+        self._write_disk(key, entry)
+
+    def _put_memory(self, key, entry):
+        size = _entry_size(entry)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= _entry_size(self._entries.pop(key))
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= _entry_size(evicted)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = pickle.load(f)
+            os.utime(self._path(key))  # keep recently used files away from eviction
+            return entry
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _write_disk(self, key, entry):
+        if not self.disk_dir:
+            return
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+            self._evict_disk()
+        except OSError as e:
+            print(f"Failed to write result cache entry {key}: {e}")
+
+    def _evict_disk(self):
+        files = []
+        total = 0
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def model_version():
+    # Input size and tiling change the detections as much as new weights do
+    settings = (
+        f"imgsz={Config.INFERENCE_IMGSZ},tile={Config.INFERENCE_TILE_SIZE}/{Config.INFERENCE_TILE_OVERLAP}/"
+        f"{','.join(Config.INFERENCE_TILED_MODELS)}/{Config.INFERENCE_TILE_NMS_THRESHOLD}"
+    )
+    return f"{model_registry.version('anomalies')}|{model_registry.version('teeth')}|{settings}"
+
+
+result_cache = ResultCache(
+    max_bytes=Config.RESULT_CACHE_MAX_MB * 1024 * 1024,
+    disk_dir=Config.RESULT_CACHE_DIR or None,
+    disk_max_bytes=Config.RESULT_CACHE_DISK_MAX_MB * 1024 * 1024,
+)
@@ -0,0 +1,149 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from config import Config
+from services.knowledge_base import embeddings, vector_store, current_collection_version
+
+
+def normalize_query(text):
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.rstrip("?!. ")
+
+
+class _LRU:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RetrievalCache:
+    """
+    Memoizes the RAG step of /chat.
+
+    Query embeddings are cached by normalized question text, and top-k results
+    by (embedding, k, collection version). The collection version is written by
+    scripts/ingest.py (in Qdrant, or next to the local index) and re-read at
+    most every `version_ttl` seconds; when it
+    changes the cached results are dropped.
+    """
+
+    def __init__(self, max_embeddings=1024, max_results=512, version_ttl=60):
+        self._embeddings = _LRU(max_embeddings)
+        self._results = _LRU(max_results)
+        self.version_ttl = version_ttl
+        self._version = None
+        self._version_checked_at = 0
+        self._lock = threading.Lock()
+        self.stats_counters = {
+            "embedding_hits": 0, "embedding_misses": 0, "embedding_miss_seconds": 0.0,
+            "result_hits": 0, "result_misses": 0, "result_miss_seconds": 0.0,
+            "invalidations": 0,
+        }
+
+    def _count(self, name, seconds=None):
+        with self._lock:
+            self.stats_counters[name] += 1
+            if seconds is not None:
+                self.stats_counters[name.replace("misses", "miss_seconds")] += seconds
+
+    def collection_version(self):
+        now = time.monotonic()
+        if self._version is not None and now - self._version_checked_at < self.version_ttl:
+            return self._version
+        version = current_collection_version()
+        with self._lock:
+            if self._version is not None and version != self._version:
+                self._results.clear()
+                self.stats_counters["invalidations"] += 1
+            self._version = version
+            self._version_checked_at = now
+        return version
+
+    def invalidate(self):
+        with self._lock:
+            self._results.clear()
+            self._version = None
+            self.stats_counters["invalidations"] += 1
+
+    def embed_query(self, text):
+        key = normalize_query(text)
+        with self._lock:
+            vector = self._embeddings.get(key)
+        if vector is not None:
+            self._count("embedding_hits")
+            return vector
+
+        start = time.perf_counter()
+        vector = np.asarray(embeddings.get().embed_query(key), dtype=np.float32)
+        self._count("embedding_misses", time.perf_counter() - start)
+        with self._lock:
+            self._embeddings.put(key, vector)
+        return vector
+
+    def similarity_search(self, query, k=3):
+        vector = self.embed_query(query)
+        version = self.collection_version()
+        key = (hashlib.sha1(vector.tobytes()).hexdigest(), k, version)
+        with self._lock:
+            docs = self._results.get(key)
+        if docs is not None:
+            self._count("result_hits")
+            return docs
+
+        start = time.perf_counter()
+        docs = vector_store.get().similarity_search_by_vector(vector.tolist(), k=k)
+        self._count("result_misses", time.perf_counter() - start)
+        with self._lock:
+            self._results.put(key, docs)
+        return docs
+
+    def stats(self):
+        with self._lock:
+            c = dict(self.stats_counters)
+            embedding_entries, result_entries = len(self._embeddings), len(self._results)
+
+        def rate(hits, misses):
+            return hits / (hits + misses) if hits + misses else 0.0
+
+        def saved(hits, misses, miss_seconds):
+            # Each hit saved roughly one average miss
+            return round(hits * miss_seconds / misses * 1000, 1) if misses else 0.0
+
+        return {
+            "embedding_hit_rate": rate(c["embedding_hits"], c["embedding_misses"]),
+            "result_hit_rate": rate(c["result_hits"], c["result_misses"]),
+            "embedding_ms_saved": saved(c["embedding_hits"], c["embedding_misses"], c["embedding_miss_seconds"]),
+            "search_ms_saved": saved(c["result_hits"], c["result_misses"], c["result_miss_seconds"]),
+            "embedding_entries": embedding_entries,
+            "result_entries": result_entries,
+            "collection_version": self._version,
+            **{name: value for name, value in c.items() if not name.endswith("seconds")},
+        }
+
+
+retrieval_cache = RetrievalCache(
+    max_embeddings=Config.RETRIEVAL_EMBEDDING_CACHE_SIZE,
+    max_results=Config.RETRIEVAL_RESULT_CACHE_SIZE,
+    version_ttl=Config.RETRIEVAL_VERSION_TTL_SECONDS,
+)
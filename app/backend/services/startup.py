@@ -0,0 +1,103 @@
+import threading
+import time
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+_resources = {}
+
+
+class LazyResource:
+    """
+    A heavy client or model that is built on first use instead of at import.
+
+    `get()` is thread-safe and builds the value at most once; a failed load is
+    retried on the next call. `loaded`, if given, tells whether the value was
+    already built by another path (e.g. models loaded straight through the
+    registry), so readiness does not wait for a `get()` that never comes.
+
+    Network clients are not `fork_safe`: a connection opened in the gunicorn
+    master would be shared by every forked worker, so eager startup leaves
+    them to `prewarm_after_fork` in each worker.
+    """
+
+    def __init__(self, name, loader, loaded=None, fork_safe=True):
+        self.name = name
+        self._loader = loader
+        self._loaded = loaded
+        self.fork_safe = fork_safe
+        self._value = None
+        self._lock = threading.Lock()
+        self.status = PENDING
+        self.error = None
+        self.load_seconds = None
+
+    def get(self):
+        if self.status == READY:
+            return self._value
+        with self._lock:
+            if self.status == READY:
+                return self._value
+            self.status = LOADING
+            start = time.perf_counter()
+            try:
+                self._value = self._loader()
+            except Exception as e:
+                self.status = FAILED
+                self.error = str(e)
+                raise
+            self.load_seconds = round(time.perf_counter() - start, 3)
+            self.error = None
+            self.status = READY
+            return self._value
+
+    def refresh(self):
+        if self.status in (PENDING, FAILED) and self._loaded is not None and self._loaded():
+            with self._lock:
+                if self.status in (PENDING, FAILED):
+                    self.error = None
+                    self.status = READY
+
+
+def lazy_resource(name, loader, loaded=None, fork_safe=True):
+    resource = LazyResource(name, loader, loaded, fork_safe)
+    _resources[name] = resource
+    return resource
+
+
+def prewarm(names=None):
+    for name in names or list(_resources):
+        try:
+            _resources[name].get()
+        except Exception as e:
+            print(f"Failed to prewarm '{name}': {e}")
+
+
+def prewarm_after_fork():
+    """Build the resources eager startup skipped; call from gunicorn's post_fork."""
+    prewarm([name for name, r in _resources.items() if not r.fork_safe])
+
+
+def start(mode):
+    """
+    `eager` loads the models now (before gunicorn forks workers; network
+    clients wait for `prewarm_after_fork` or their first use), `background`
+    loads everything in a thread while routes already answer, `lazy` waits
+    for the first request that needs each resource.
+    """
+    if mode == "eager":
+        prewarm([name for name, r in _resources.items() if r.fork_safe])
+    elif mode == "background":
+        threading.Thread(target=prewarm, name="prewarm", daemon=True).start()
+
+
+def readiness():
+    for resource in _resources.values():
+        resource.refresh()
+    resources = {
+        name: {"status": r.status, "load_seconds": r.load_seconds, "error": r.error}
+        for name, r in _resources.items()
+    }
+    return all(r.status == READY for r in _resources.values()), resources
@@ -0,0 +1,129 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from flask import current_app, g
+from supabase import create_client, Client, ClientOptions
+
+
+def _client_options(config):
+    return ClientOptions(
+        postgrest_client_timeout=config["SUPABASE_TIMEOUT"],
+        storage_client_timeout=config["SUPABASE_STORAGE_TIMEOUT"],
+        # Server-side clients never keep a user session around
+        auto_refresh_token=False,
+        persist_session=False,
+    )
+
+
+class SupabasePool:
+    """
+    Per-worker pool of long-lived Supabase clients.
+
+    Each client keeps its HTTP sessions (and their keep-alive connections) for
+    the life of the worker, instead of `create_client` rebuilding them on every
+    request. At most `size` requests use the database at once; others wait up
+    to `timeout` seconds for a client to be returned.
+    """
+
+    def __init__(self, url, key, options, size=4, timeout=10):
+        self.url = url
+        self.key = key
+        self.options = options
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Client:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return create_client(self.url, self.key, options=self.options)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RuntimeError("Timed out waiting for a Supabase connection")
+
+    def release(self, client):
+        self._idle.put(client)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool():
+    config = current_app.config
+    # Keyed by pid so a forked gunicorn worker never reuses its parent's connections
+    key = (os.getpid(), config["SUPABASE_URL"], config["SUPABASE_KEY"])
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = SupabasePool(
+                config["SUPABASE_URL"],
+                config["SUPABASE_KEY"],
+                _client_options(config),
+                size=config["SUPABASE_POOL_SIZE"],
+                timeout=config["SUPABASE_POOL_TIMEOUT"],
+            )
+            _pools[key] = pool
+        return pool
+
+
+# Function to get Supabase client
+def get_supabase_client() -> Client:
+    """Pooled client for table and storage access, returned to the pool when the request ends."""
+    if "supabase" not in g:
+        pool = _get_pool()
+        g.supabase = pool.acquire()
+        g.supabase_pool = pool
+    return g.supabase
+
+
+@contextmanager
+def pooled_client():
+    """
+    Pooled client for a block of work, returned to the pool when the block ends
+    rather than at request teardown; for routes that keep streaming afterwards.
+    """
+    pool = _get_pool()
+    client = pool.acquire()
+    try:
+        yield client
+    finally:
+        pool.release(client)
+
+
+def get_auth_client() -> Client:
+    """
+    Fresh client for sign-up, sign-in and sign-out. Those calls store the user's
+    session on the client, so it must not be shared with other requests.
+    """
+    config = current_app.config
+    return create_client(config["SUPABASE_URL"], config["SUPABASE_KEY"], options=_client_options(config))
+
+
+def release_supabase_client(exception=None):
+    client = g.pop("supabase", None)
+    pool = g.pop("supabase_pool", None)
+    if client is not None and pool is not None:
+        pool.release(client)
+
+
+def init_app(app):
+    app.teardown_appcontext(release_supabase_client)
@@ -0,0 +1,100 @@
+import numpy as np
+from services.detectors import Boxes, Detections
+
+
+def _to_numpy(values):
+    if hasattr(values, 'cpu'):
+        values = values.cpu().numpy()
+    return np.asarray(values)
+
+
+def tile_origins(length, tile_size, overlap):
+    """Start offsets covering `length` with tiles of `tile_size` overlapping by at least `overlap`."""
+    if length <= tile_size:
+        return [0]
+    step = max(1, tile_size - overlap)
+    origins = list(range(0, length - tile_size, step))
+    # The last tile is aligned to the far edge instead of running past it
+    origins.append(length - tile_size)
+    return origins
+
+
+def make_tiles(image, tile_size, overlap):
+    """
+    Split an image into overlapping tiles.
+
+    Returns:
+        list: `(x, y, tile)` with the tile's top-left corner; tiles are views, not copies.
+    """
+    height, width = image.shape[:2]
+    return [
+        (x, y, image[y:y + tile_size, x:x + tile_size])
+        for y in tile_origins(height, tile_size, overlap)
+        for x in tile_origins(width, tile_size, overlap)
+    ]
+
+
+def nms(boxes, scores, classes, threshold, tiles=None):
+    """
+    Class-aware non-maximum suppression over (N x 4) xyxy boxes.
+
+    Between boxes of different tiles, overlap is measured as intersection over
+    the smaller box, so the partial box of an object cut by a tile edge is
+    suppressed by the complete box from the neighbouring tile even though their
+    IoU is low. Boxes of the same tile (`tiles` gives each box's tile) already
+    went through the detector's NMS, so they are compared by plain IoU and a
+    smaller finding inside a larger one is kept.
+
+    Returns:
+        ndarray: Indices of the kept boxes, highest score first.
+    """
+    order = np.argsort(-scores, kind='stable')
+    areas = np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        iw = np.clip(np.minimum(boxes[i, 2], boxes[rest, 2]) - np.maximum(boxes[i, 0], boxes[rest, 0]), 0, None)
+        ih = np.clip(np.minimum(boxes[i, 3], boxes[rest, 3]) - np.maximum(boxes[i, 1], boxes[rest, 1]), 0, None)
+        inter = iw * ih
+        denominator = np.minimum(areas[i], areas[rest])
+        if tiles is not None:
+            same_tile = tiles[rest] == tiles[i]
+            denominator = np.where(same_tile, areas[i] + areas[rest] - inter, denominator)
+        overlap = np.divide(inter, denominator, out=np.zeros_like(denominator), where=denominator > 0)
+        order = rest[(overlap <= threshold) | (classes[rest] != classes[i])]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def merge_tiles(results, origins, num_images, threshold):
+    """
+    Combine per-tile detections into one result per image.
+
+    Args:
+        results (list): Detector results, one per tile.
+        origins (list): `(image_index, x, y)` of each tile.
+        num_images (int): Number of images the tiles came from.
+        threshold (float): Overlap above which same-class boxes are merged.
+
+    Returns:
+        list: One `Detections` per image, boxes in full-image coordinates.
+    """
+    per_image = [([], [], [], []) for _ in range(num_images)]
+    for tile, (result, (index, x, y)) in enumerate(zip(results, origins)):
+        xyxy = _to_numpy(result.boxes.xyxy).reshape(-1, 4) + np.array([x, y, x, y], dtype=np.float32)
+        boxes, scores, classes, tiles = per_image[index]
+        boxes.append(xyxy)
+        scores.append(_to_numpy(result.boxes.conf).reshape(-1))
+        classes.append(_to_numpy(result.boxes.cls).reshape(-1))
+        tiles.append(np.full(len(xyxy), tile, dtype=np.int64))
+
+    merged = []
+    for boxes, scores, classes, tiles in per_image:
+        boxes = np.concatenate(boxes) if boxes else np.zeros((0, 4), np.float32)
+        scores = np.concatenate(scores) if scores else np.zeros(0, np.float32)
+        classes = np.concatenate(classes) if classes else np.zeros(0, np.float32)
+        tiles = np.concatenate(tiles) if tiles else np.zeros(0, np.int64)
+        keep = nms(boxes, scores, classes, threshold, tiles)
+        merged.append(Detections(Boxes(boxes[keep], scores[keep], classes[keep])))
+    return merged
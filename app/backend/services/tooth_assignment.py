@@ -0,0 +1,69 @@
+import numpy as np
+
+IOU_THRESHOLD = 0.05  # relaxed on purpose, anomaly boxes are much smaller than teeth
+NUM_TEETH = 32
+
+
+def as_boxes(boxes):
+    """Accept a `result.boxes.xyxy` tensor, an ndarray or a list of (x1, y1, x2, y2)."""
+    if hasattr(boxes, 'cpu'):
+        boxes = boxes.cpu().numpy()
+    # Truncate to pixel coordinates, like map(int, bbox) did
+    return np.trunc(np.asarray(boxes, dtype=np.float64).reshape(-1, 4))
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """IoU of every box in `boxes_a` (N x 4) against every box in `boxes_b` (M x 4)."""
+    ax1, ay1, ax2, ay2 = (boxes_a[:, i, None] for i in range(4))
+    bx1, by1, bx2, by2 = (boxes_b[None, :, i] for i in range(4))
+
+    iw = np.clip(np.minimum(ax2, bx2) - np.maximum(ax1, bx1), 0, None)
+    ih = np.clip(np.minimum(ay2, by2) - np.maximum(ay1, by1), 0, None)
+    intersection = iw * ih
+    union = (ax2 - ax1) * (ay2 - ay1) + (bx2 - bx1) * (by2 - by1) - intersection
+
+    iou = np.zeros_like(intersection)
+    np.divide(intersection, union, out=iou, where=union != 0)
+    return iou
+
+
+def overlap_matrix(boxes_a, boxes_b):
+    """True where the boxes touch or overlap at all."""
+    return (
+        (boxes_a[:, 2, None] >= boxes_b[None, :, 0])
+        & (boxes_a[:, 0, None] <= boxes_b[None, :, 2])
+        & (boxes_a[:, 3, None] >= boxes_b[None, :, 1])
+        & (boxes_a[:, 1, None] <= boxes_b[None, :, 3])
+    )
+
+
+def assign_anomalies(tooth_boxes, anomaly_boxes, anomaly_names, iou_threshold=IOU_THRESHOLD):
+    """
+    Build the per-tooth report from numbered tooth boxes and anomaly detections.
+
+    `tooth_boxes` must be ordered by tooth number (tooth 1 first). An anomaly is
+    assigned to every tooth it overlaps with IoU above `iou_threshold`; if there
+    is none, it falls back to every tooth its box touches.
+
+    Returns:
+        dict: tooth number (1-32) -> list of anomaly names, without duplicates.
+    """
+    report = {i: [] for i in range(1, NUM_TEETH + 1)}
+
+    teeth = as_boxes(tooth_boxes)[:NUM_TEETH]
+    anomalies = as_boxes(anomaly_boxes)
+    if len(teeth) == 0 or len(anomalies) == 0:
+        return report
+
+    matches = iou_matrix(anomalies, teeth) > iou_threshold
+    unassigned = ~matches.any(axis=1)
+    if unassigned.any():
+        matches[unassigned] = overlap_matrix(anomalies[unassigned], teeth)
+
+    # nonzero() walks anomalies in detection order, which keeps each tooth's list ordered as before
+    for anomaly_idx, tooth_idx in zip(*np.nonzero(matches)):
+        name = anomaly_names[anomaly_idx]
+        findings = report[int(tooth_idx) + 1]
+        if name not in findings:
+            findings.append(name)
+    return report
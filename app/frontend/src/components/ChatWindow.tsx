@@ -10,9 +10,10 @@ interface Message {
 interface ChatWindowProps {
   onClose: () => void;
   report?: any; // Add report prop
+  patientId?: string; // The backend summarizes all of the patient's radiographs instead
 }
 
-const ChatWindow: React.FC<ChatWindowProps> = ({ onClose, report }) => {
+const ChatWindow: React.FC<ChatWindowProps> = ({ onClose, report, patientId }) => {
   const [messages, setMessages] = useState<Message[]>(() => {
     // Retrieve messages from localStorage on initial load
     const savedMessages = localStorage.getItem("chatMessages");
@@ -49,7 +50,7 @@ const ChatWindow: React.FC<ChatWindowProps> = ({ onClose, report }) => {
         body: JSON.stringify({
           message: input,
           history: messages, // Include chat history
-          report, // Include report data
+          ...(patientId ? { patient_id: patientId } : { report }), // Include report data
         }),
       });
       const data = await response.json();
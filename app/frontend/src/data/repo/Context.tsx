@@ -24,18 +24,24 @@ export const RepoProvider: React.FC<{ children: React.ReactNode }> = ({
   const fetchPatients = async () => {
     try {
       const userId = localStorage.getItem("user_id") || "";
-
-      const params = new URLSearchParams({ user_id: userId });
       const base_URL = "https://ortho-vision-backend.fly.dev//patients";
-      const response = await fetch(`${base_URL}?${params}`, {
-        method: "GET",
-        headers: {
-          "Content-Type": "application/json",
-        },
-      });
-      const data = await response.json();
+      const fields = "id,user_id,fullname,email,phone,date_of_birth,gender";
+
+      // Pages arrive in order; the list shows the first one while the rest load
+      let cursor: string | null = null;
+      let loaded: Patient[] = [];
+      do {
+        const params = new URLSearchParams({ user_id: userId, fields });
+        if (cursor) params.set("cursor", cursor);
+        const response = await fetch(`${base_URL}?${params}`, {
+          method: "GET",
+          headers: {
+            "Content-Type": "application/json",
+          },
+        });
+        const data = await response.json();
+        if (!Array.isArray(data.patients)) break;
 
-      if (Array.isArray(data.patients)) {
         const transformedPatients = data.patients.map((patient: any) => ({
           id: patient.id,
           user_id: patient.user_id,
@@ -45,8 +51,10 @@ export const RepoProvider: React.FC<{ children: React.ReactNode }> = ({
           dob: new Date(patient.date_of_birth), // Convert to Date object
           gender: patient.gender,
         }));
-        setPatients(transformedPatients);
-      }
+        loaded = [...loaded, ...transformedPatients];
+        setPatients(loaded);
+        cursor = data.next_cursor ?? null;
+      } while (cursor);
     } catch (error: any) {
       console.error("[ERROR] Fetch Patients:", error.message);
     }
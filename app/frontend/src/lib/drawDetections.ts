@@ -0,0 +1,47 @@
+// Response of POST /upload?format=json
+export interface DetectionPayload {
+  report_id: string;
+  width: number;
+  height: number;
+  classes: Record<string, { label: string; name: string; color: string }>;
+  teeth: { number: number; box: number[] }[];
+  anomalies: { box: number[]; class_id: number; score: number }[];
+  report: Record<string, string[]>;
+}
+
+// Draws the radiograph with its anomaly boxes and labels, the way the server used to
+export async function drawDetections(
+  imageUrl: string,
+  detections: DetectionPayload
+): Promise<HTMLCanvasElement> {
+  const image = new Image();
+  image.src = imageUrl;
+  await image.decode();
+
+  const canvas = document.createElement("canvas");
+  canvas.width = image.naturalWidth;
+  canvas.height = image.naturalHeight;
+  const context = canvas.getContext("2d");
+  if (!context) return canvas;
+  context.drawImage(image, 0, 0);
+
+  // Boxes are in the coordinates of the image the server decoded
+  const scale = detections.width ? canvas.width / detections.width : 1;
+  const fontSize = Math.max(16, Math.round(canvas.width / 100));
+  context.font = `${fontSize}px sans-serif`;
+  context.lineWidth = 2;
+
+  for (const anomaly of detections.anomalies) {
+    const [x1, y1, x2, y2] = anomaly.box.map((value) => value * scale);
+    const { label, color } = detections.classes[anomaly.class_id];
+
+    context.strokeStyle = color;
+    context.strokeRect(x1, y1, x2 - x1, y2 - y1);
+    const textWidth = context.measureText(label).width;
+    context.fillStyle = color;
+    context.fillRect(x1, y1 - fontSize - 2, textWidth, fontSize + 2);
+    context.fillStyle = "#ffffff";
+    context.fillText(label, x1, y1 - 2);
+  }
+  return canvas;
+}
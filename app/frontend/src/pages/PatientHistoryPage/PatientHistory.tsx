@@ -13,6 +13,8 @@ interface HistoryItem {
   id: string;
   date: string;
   url: string;
+  thumbnailUrl: string;
+  previewUrl: string;
   patientName: string;
   report: string;
 }
@@ -75,24 +77,37 @@ export default function HistoryList() {
 
     const fetchHistoryItems = async () => {
         try {
-          const response = await fetch(`https://ortho-vision-backend.fly.dev//radiographs?patient_id=${id}`, {
-            headers: {
-              Authorization: `Bearer ${token}`, // Include the JWT token
-            },
-          });
-          const data = await response.json();
-          if (response.ok) {
-            setHistoryItems(
-              data.patients.map((item: any) => ({
+          // Newest radiographs come first; older pages are appended as they arrive
+          let cursor: string | null = null;
+          let loaded: any[] = [];
+          do {
+            const params = new URLSearchParams({ patient_id: id ?? "", fields: "id,date,url,thumbnail_url,preview_url,report" });
+            if (cursor) params.set("cursor", cursor);
+            const response = await fetch(`https://ortho-vision-backend.fly.dev//radiographs?${params}`, {
+              headers: {
+                Authorization: `Bearer ${token}`, // Include the JWT token
+              },
+            });
+            const data = await response.json();
+            if (!response.ok) {
+              console.error("Failed to fetch history items:", data.error);
+              break;
+            }
+            loaded = [
+              ...loaded,
+              ...data.patients.map((item: any) => ({
                 id: item.id,
                 date: item.date,
                 url: item.url,
+                // Rows saved before derivatives existed fall back to the original
+                thumbnailUrl: item.thumbnail_url ?? item.url,
+                previewUrl: item.preview_url ?? item.url,
                 report: item.report,
-              }))
-            );
-          } else {
-            console.error("Failed to fetch history items:", data.error);
-          }
+              })),
+            ];
+            setHistoryItems(loaded);
+            cursor = data.next_cursor ?? null;
+          } while (cursor);
         } catch (error) {
           console.error("Error fetching history items:", error);
         }
@@ -198,12 +213,13 @@ return (
             <div
               key={item.id}
               className={`grid ${role === "doctor" ? "grid-cols-5" : "grid-cols-4"} gap-4 p-4 items-center`}
-              onClick={() => handleOpenDialog(item.url, item.report)}
+              onClick={() => handleOpenDialog(item.previewUrl, item.report)}
             >
               <div className="flex items-center">
                 <img
-                  src={item.url}
+                  src={item.thumbnailUrl}
                   alt="Radiograph preview"
+                  loading="lazy"
                   className="w-24 h-24 object-cover rounded cursor-pointer"
                 />
               </div>
@@ -262,7 +278,7 @@ return (
     <ChatBubbleButton onClick={() => setIsChatOpen(!isChatOpen)} />
 
     {/* Chat Window */}
-    {isChatOpen && <ChatWindow onClose={() => setIsChatOpen(false)} report={historyItems.map(item => item.report)} />}
+    {isChatOpen && <ChatWindow onClose={() => setIsChatOpen(false)} patientId={id} />}
 
     {/* Confirmation Dialog for Deletion */}
     {showDeleteConfirmDialog && (
@@ -13,6 +13,7 @@ import {
 import { useEffect, useRef, useState } from "react";
 import { useNavigate, useParams } from "react-router-dom";
 import ReportTeethOverlay from "@/components/ReportTeethOverlay";
+import { drawDetections, type DetectionPayload } from "@/lib/drawDetections";
 
 export default function AnalysisPage() {
   const navigate = useNavigate();
@@ -111,25 +112,30 @@ export default function AnalysisPage() {
     formData.append("file", file);
     console.log("File:", file);
     try {
-      const response = await fetch("https://ortho-vision-backend.fly.dev//upload", {
+      // Only the boxes and the report come back; the overlay is drawn here on the original
+      const response = await fetch("https://ortho-vision-backend.fly.dev//upload?format=json", {
         method: "POST",
 
         body: formData,
       });
 
       if (response.ok) {
-        const imageBlob = await response.blob();
-        const imageURL = URL.createObjectURL(imageBlob);
-        setAnalysisImage(imageURL);
-        setAnalysisBlob(imageBlob);
-        const reportResponse = await fetch("https://ortho-vision-backend.fly.dev//report", {
-          method: "GET",
-        });
+        const detections: DetectionPayload = await response.json();
+        console.log("Report Data:", detections.report);
+        setReport(detections.report);
 
-        if (reportResponse.ok) {
-          const reportData = await reportResponse.json();
-          console.log("Report Data:", reportData);
-          setReport(reportData);
+        const originalURL = URL.createObjectURL(file);
+        try {
+          const canvas = await drawDetections(originalURL, detections);
+          const imageBlob = await new Promise<Blob | null>((resolve) =>
+            canvas.toBlob(resolve, "image/jpeg", 0.9)
+          );
+          if (imageBlob) {
+            setAnalysisImage(URL.createObjectURL(imageBlob));
+            setAnalysisBlob(imageBlob);
+          }
+        } finally {
+          URL.revokeObjectURL(originalURL);
         }
       } else {
         console.error("Failed to upload image");